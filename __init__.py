@@ -1,5 +1,12 @@
 # -*- coding: utf-8 -*-
+import contextlib
 
-# from . import controllers
+from . import controllers
 from . import models
 from . import wizard
+
+
+def pre_init_hook(env):
+    """Trigram indexes need pg_trgm: Odoo creates it on new databases, older ones may lack it"""
+    with contextlib.suppress(Exception), env.cr.savepoint():
+        env.cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
@@ -1,6 +1,6 @@
 {
     'name': 'Rental Management System',
-    'version': '1.0.0',
+    'version': '1.0.7',
     'category': 'Operations/Rental',
     'summary': 'Professional rental management system for products and equipment',
     'description': '''
@@ -40,6 +40,8 @@
         
         # Data
         'data/sequences.xml',
+        'data/rental_cron.xml',
+        'data/rental_config_data.xml',
         
         # Views (URUTAN PENTING!)
         'views/rental_menu_views.xml',    
@@ -47,6 +49,12 @@
         'views/rental_product_views.xml',
         'views/rental_order_views.xml',
         'views/rental_payment_wizard_views.xml',
+        'views/rental_payment_views.xml',
+        'views/rental_holiday_views.xml',
+        'views/rental_maintenance_views.xml',
+        'views/rental_order_report_views.xml',
+        'views/rental_bulk_import_wizard_views.xml',
+        'views/rental_profiler_wizard_views.xml',
     ],
     
     # Demo Data (optional)
@@ -71,6 +79,7 @@
     
     # Technical
     'sequence': 10,
+    'pre_init_hook': 'pre_init_hook',
     'post_init_hook': None,
     'uninstall_hook': None,
     
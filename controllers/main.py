@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+from odoo import http, fields
+from odoo.http import request, content_disposition
+
+# Image sizes served by /rental/product/<id>/image/<size>, see image.mixin
+PRODUCT_IMAGE_SIZES = (128, 256, 512, 1024, 1920)
+# Browser cache lifetime of product images without a unique (cache busting) parameter
+PRODUCT_IMAGE_MAX_AGE = 3600
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv;charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+class RentalController(http.Controller):
+    
+    @http.route('/rental/quote', type='json', auth='user', methods=['POST'])
+    def quote(self, lines=None, **line):
+        """Price prospective rentals: either one line (product_id, start_date, end_date,
+        quantity) or a batch under 'lines'. Nothing is written."""
+        return request.env['rental.order'].get_quotes(lines if lines is not None else [line])
+    
+    @http.route('/rental/search', type='json', auth='user', methods=['POST'])
+    def quick_search(self, term, limit=10):
+        """Type-ahead search over customers, products and orders"""
+        return request.env['rental.search'].quick_search(term, limit=limit)
+    
+    @http.route(['/rental/scan/checkout', '/rental/scan/return'], type='json', auth='user', methods=['POST'])
+    def scan(self, codes=None, code=None):
+        """Check out or return the orders of scanned order numbers or serial numbers: one code,
+        or a batch under 'codes' (scans queued by a device while offline)"""
+        transition = 'return' if request.httprequest.path.endswith('/return') else 'start'
+        return request.env['rental.order'].scan_transition(transition, codes if codes is not None else [code])
+    
+    @http.route('/rental/product/<int:product_id>/image/<int:size>', type='http', auth='user', methods=['GET'])
+    def product_image(self, product_id, size=128, unique=None):
+        """Serve a product image variant with an ETag (attachment checksum), answering 304 to
+        revalidations; with unique (e.g. the product's write date) it is cached as immutable"""
+        if size not in PRODUCT_IMAGE_SIZES:
+            raise request.not_found()
+        product = request.env['rental.product'].browse(product_id).exists()
+        if not product:
+            raise request.not_found()
+        stream = request.env['ir.binary']._get_image_stream_from(
+            product, f'image_{size}', placeholder='web/static/img/placeholder.png')
+        return stream.get_response(max_age=http.STATIC_CACHE_LONG if unique else PRODUCT_IMAGE_MAX_AGE,
+                                   immutable=bool(unique))
+    
+    @http.route('/rental/export/<string:export>', type='http', auth='user', methods=['GET'])
+    def export(self, export, format='csv', date_from=None, date_to=None):
+        """Stream all orders or payments as CSV or XLSX, optionally between two dates"""
+        stream = request.env['rental.export']._stream_export(export, format, date_from=date_from or None,
+                                                             date_to=date_to or None)
+        filename = f"rental_{export}_{fields.Date.context_today(request.env.user)}.{format}"
+        return request.make_response(stream, headers=[
+            ('Content-Type', EXPORT_MIMETYPES[format]),
+            ('Content-Disposition', content_disposition(filename)),
+        ])
@@ -0,0 +1,8 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Order and product codes now come from ir.sequence: start after the existing ones"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['rental.order']._sync_sequence_with_codes()
+    env['rental.product']._sync_sequence_with_codes()
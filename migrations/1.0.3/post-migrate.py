@@ -0,0 +1,19 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """paid_amount now sums the payment ledger: record the amounts paid so far as opening payments"""
+    cr.execute("""
+        INSERT INTO rental_payment (order_id, customer_id, amount, payment_date, payment_method,
+                                    reference, create_uid, create_date, write_uid, write_date)
+        SELECT o.id, o.customer_id, o.paid_amount, COALESCE(o.write_date, o.create_date)::date,
+               'cash', 'Opening balance', %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+          FROM rental_order o
+         WHERE o.paid_amount > 0
+           AND NOT EXISTS (SELECT 1 FROM rental_payment p WHERE p.order_id = o.id)
+    """, {'uid': SUPERUSER_ID})
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    orders = env['rental.order'].search([])
+    env.add_to_compute(orders._fields['paid_amount'], orders)
+    env.add_to_compute(orders._fields['payment_status'], orders)
+    env.flush_all()
@@ -0,0 +1,7 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Outstanding balances are now stored and maintained by delta: build the initial values"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['rental.customer']._cron_reconcile_outstanding_balances()
@@ -0,0 +1,8 @@
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    """Display names are now stored: fill them with one UPDATE per model"""
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    for model in ('rental.customer', 'rental.product', 'rental.order'):
+        env[model]._fill_complete_name()
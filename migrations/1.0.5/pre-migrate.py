@@ -0,0 +1,4 @@
+def migrate(cr, version):
+    """Create the complete_name columns up front so the ORM does not compute them record by record"""
+    for table in ('rental_customer', 'rental_product', 'rental_order'):
+        cr.execute(f'ALTER TABLE "{table}" ADD COLUMN IF NOT EXISTS complete_name VARCHAR')
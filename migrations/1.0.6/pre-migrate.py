@@ -0,0 +1,13 @@
+import contextlib
+
+from odoo.modules.db import has_trigram
+from odoo.modules.registry import Registry
+
+
+def migrate(cr, version):
+    """pre_init_hook only runs on install: create pg_trgm for databases upgraded from older versions,
+    before the module is loaded so its trigram indexes get created"""
+    with contextlib.suppress(Exception), cr.savepoint():
+        cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # The registry probed the extension when it was set up, before this script ran
+    Registry(cr.dbname).has_trigram = has_trigram(cr)
@@ -0,0 +1,27 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# table -> column that must be unique before its UNIQUE constraint can be added
+UNIQUE_CODES = {
+    'rental_order': 'name',
+    'rental_product': 'product_code',
+}
+
+
+def migrate(cr, version):
+    """Make order numbers and product codes unique, otherwise their UNIQUE constraints are skipped:
+    every duplicate but the oldest record gets its id appended"""
+    for table, column in UNIQUE_CODES.items():
+        cr.execute(f"""
+            UPDATE "{table}" t
+               SET "{column}" = t."{column}" || '-' || t.id
+              FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY "{column}" ORDER BY id) AS rank
+                  FROM "{table}"
+                 WHERE "{column}" IS NOT NULL
+             ) d
+             WHERE t.id = d.id AND d.rank > 1
+        """)
+        if cr.rowcount:
+            _logger.warning("%s: %d duplicate %s value(s) renamed", table, cr.rowcount, column)
@@ -1,5 +1,15 @@
 # -*- coding: utf-8 -*-
 
+from . import rental_sequence_mixin
+from . import rental_profiling
+from . import rental_pricing
+from . import rental_holiday
 from . import rental_customer
 from . import rental_order
-from . import rental_product
\ No newline at end of file
+from . import rental_product
+from . import rental_maintenance
+from . import rental_payment
+from . import rental_search
+from . import rental_order_report
+from . import rental_export
+from . import rental_benchmark
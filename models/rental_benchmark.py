@@ -0,0 +1,344 @@
+# rental_benchmark.py
+import json
+import logging
+import os
+import random
+import time
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import config
+
+from .rental_order import EXPOSURE_STATES
+
+_logger = logging.getLogger(__name__)
+
+# Code prefixes of the generated records, distinct from the ir.sequence ones
+BENCH_CUSTOMER_PREFIX = 'BCUST'
+BENCH_PRODUCT_PREFIX = 'BPROD'
+BENCH_ORDER_PREFIX = 'BRO'
+# Generated order history spans this many days, ending a quarter ahead of today
+BENCH_HISTORY_DAYS = 3 * 365
+BENCH_FUTURE_DAYS = 90
+# Allowed slowdown over the baseline wall time before a benchmark fails
+BENCH_TIME_TOLERANCE = 0.25
+# Runs per benchmark, the fastest wall time is kept
+BENCH_REPEAT = 3
+
+
+class BenchmarkRollback(Exception):
+    """Raised inside a benchmark's savepoint so nothing it writes is kept"""
+
+
+class RentalBenchmark(models.AbstractModel):
+    """Synthetic data generator and benchmark harness for the rental hot paths.
+    
+    From an Odoo shell, on the full-size dataset:
+        env['rental.benchmark']._generate_data()
+        env['rental.benchmark']._run_benchmarks()
+    
+    A scaled-down run is part of the test suite, tagged rental_benchmark and
+    excluded from the standard tests (tests/test_rental_benchmark.py).
+    """
+    _name = 'rental.benchmark'
+    _description = 'Rental Benchmarks'
+    
+    # ======== DATA GENERATOR ========
+    
+    @api.model
+    def _generate_data(self, customers=1_000_000, products=100_000, orders=10_000_000, seed=42):
+        """Insert seeded synthetic customers, products and orders with generate_series.
+        
+        Each product receives a series of orders spread over the history window
+        with random gaps and durations, so bookings overlap the way they do in
+        the shop (up to the product's quantity); orders in the past are done
+        (5% cancelled), running ones ongoing and future ones confirmed. Prices
+        use the flat daily rate; done orders get a payment line for their total
+        and every paid amount is summed from the ledger. The stored statistics
+        and balances are then rebuilt in bulk.
+        """
+        if self.env['rental.product'].with_context(active_test=False).search_count(
+                [('product_code', '=like', f'{BENCH_PRODUCT_PREFIX}%')], limit=1):
+            raise UserError("Benchmark data already exists, purge it first!")
+        self.env.flush_all()
+        cr = self.env.cr
+        today = fields.Date.context_today(self)
+        audit = {'uid': self.env.uid, 'company_id': self.env.company.id}
+        started = time.monotonic()
+        cr.execute("SELECT setseed(%s)", [(seed % 1000) / 1000.0])
+        
+        cr.execute("""
+            INSERT INTO rental_customer (name, email, phone, customer_code, customer_type, active, credit_limit,
+                                         outstanding_balance, rating, archived_rental_count, archived_total_spent,
+                                         create_uid, create_date, write_uid, write_date)
+                 SELECT 'Customer ' || g, 'customer' || g || '@example.com',
+                        '08' || lpad((g * 7919 %% 100000000)::text, 10, '0'),
+                        %(prefix)s || lpad(g::text, 8, '0'), 'individual', TRUE,
+                        CASE WHEN random() < 0.2 THEN 5000 ELSE 0 END,
+                        0, '3', 0, 0, %(uid)s, NOW(), %(uid)s, NOW()
+                   FROM generate_series(1, %(count)s) g
+        """, dict(audit, prefix=BENCH_CUSTOMER_PREFIX, count=customers))
+        cr.execute("""
+            INSERT INTO rental_product (name, product_code, serial_number, price_per_day, price_per_week,
+                                        price_per_month, quantity, status, active, condition, security_deposit,
+                                        insurance_required, min_rental_days, max_rental_days, maintenance_interval_days,
+                                        purchase_date, rental_count, total_rental_days, total_revenue,
+                                        occupancy_version, create_uid, create_date, write_uid, write_date)
+                 SELECT 'Product ' || g, %(prefix)s || lpad(g::text, 7, '0'), 'SN-BENCH-' || g,
+                        d.price, d.price * 6, d.price * 25, 1 + floor(random() * 5)::int,
+                        'available', TRUE, 'good', d.price * 2, FALSE, 1, 365, 365,
+                        %(today)s::date - %(history)s, 0, 0, 0, 0, %(uid)s, NOW(), %(uid)s, NOW()
+                   FROM generate_series(1, %(count)s) g,
+                        LATERAL (SELECT round((10 + random() * 490)::numeric, 2)::float8 AS price) d
+        """, dict(audit, prefix=BENCH_PRODUCT_PREFIX, count=products, today=today, history=BENCH_HISTORY_DAYS))
+        
+        # k-th order of a product: start spread evenly over the window plus jitter, 1 to 14 days long
+        cr.execute("""
+            WITH c AS (SELECT array_agg(id) AS ids, COUNT(*) AS n FROM rental_customer WHERE customer_code LIKE %(cprefix)s),
+                 p AS (SELECT array_agg(id ORDER BY id) AS ids, COUNT(*) AS n FROM rental_product WHERE product_code LIKE %(pprefix)s),
+                 o AS (
+                SELECT g,
+                       c.ids[1 + floor(random() * c.n)::int] AS customer_id,
+                       p.ids[1 + (g %% p.n)::int] AS product_id,
+                       %(first_day)s::date + ((g / p.n) * %(span)s / GREATEST(%(count)s / p.n, 1))::int
+                                           + floor(random() * 7)::int AS start_date,
+                       1 + floor(random() * 14)::int AS days,
+                       random() AS roll
+                  FROM generate_series(0, %(count)s - 1) g, c, p
+             )
+            INSERT INTO rental_order (name, customer_id, product_id, quantity, start_date, end_date,
+                                      actual_return_date, price_per_day, deposit_amount, rental_days, subtotal,
+                                      tax_amount, insurance_fee, late_fee, damage_fee, total_price, paid_amount,
+                                      remaining_amount, state, payment_status, is_overdue, active, user_id,
+                                      company_id, create_uid, create_date, write_uid, write_date)
+                 SELECT %(oprefix)s || lpad(o.g::text, 8, '0'), o.customer_id, o.product_id, 1,
+                        o.start_date, o.start_date + o.days - 1,
+                        CASE WHEN o.start_date + o.days - 1 < %(today)s THEN o.start_date + o.days - 1 END,
+                        pr.price_per_day, pr.security_deposit, o.days, o.days * pr.price_per_day,
+                        o.days * pr.price_per_day * %(tax)s, 0, 0, 0,
+                        o.days * pr.price_per_day * (1 + %(tax)s), 0,
+                        o.days * pr.price_per_day * (1 + %(tax)s),
+                        CASE WHEN o.start_date > %(today)s THEN 'confirmed'
+                             WHEN o.start_date + o.days - 1 >= %(today)s THEN 'ongoing'
+                             WHEN o.roll < 0.05 THEN 'cancelled'
+                             ELSE 'done' END,
+                        'unpaid', FALSE, TRUE, %(uid)s, %(company_id)s, %(uid)s, NOW(), %(uid)s, NOW()
+                   FROM o
+                   JOIN rental_product pr ON pr.id = o.product_id
+        """, dict(audit, cprefix=f'{BENCH_CUSTOMER_PREFIX}%', pprefix=f'{BENCH_PRODUCT_PREFIX}%',
+                  oprefix=BENCH_ORDER_PREFIX, count=orders, today=today,
+                  first_day=today - timedelta(days=BENCH_HISTORY_DAYS),
+                  span=BENCH_HISTORY_DAYS + BENCH_FUTURE_DAYS,
+                  tax=self.env['rental.pricing']._get_tax_rate()))
+        
+        # Done orders were paid in full on return: one ledger line each, paid amounts summed from
+        # the ledger as _compute_payment_amounts does
+        cr.execute("""
+            INSERT INTO rental_payment (order_id, customer_id, amount, payment_date, payment_method, user_id,
+                                        create_uid, create_date, write_uid, write_date)
+                 SELECT id, customer_id, total_price, end_date, 'cash', %(uid)s, %(uid)s, NOW(), %(uid)s, NOW()
+                   FROM rental_order
+                  WHERE name LIKE %(oprefix)s AND state = 'done';
+            UPDATE rental_order o
+               SET paid_amount = l.paid,
+                   remaining_amount = o.total_price - l.paid,
+                   payment_status = CASE WHEN l.paid <= 0 THEN 'unpaid'
+                                         WHEN l.paid >= o.total_price THEN 'paid'
+                                         ELSE 'partial' END
+              FROM (
+                SELECT order_id, SUM(amount) AS paid
+                  FROM rental_payment
+                 WHERE order_id IN (SELECT id FROM rental_order WHERE name LIKE %(oprefix)s)
+              GROUP BY order_id
+             ) l
+             WHERE o.id = l.order_id
+        """, dict(audit, oprefix=f'{BENCH_ORDER_PREFIX}%'))
+        
+        for model in ('rental.customer', 'rental.product', 'rental.order'):
+            self.env[model]._fill_complete_name()
+        self._rebuild_statistics()
+        elapsed = time.monotonic() - started
+        _logger.info("Benchmark data: %d customers, %d products, %d orders generated in %.1fs",
+                     customers, products, orders, elapsed)
+        return {'customers': customers, 'products': products, 'orders': orders, 'elapsed': elapsed}
+    
+    @api.model
+    def _rebuild_statistics(self):
+        """Rebuild every stored rollup after rows were written behind the ORM's back"""
+        self.env.invalidate_all()
+        self.env['rental.product']._recompute_rental_statistics()
+        self.env.cr.execute("""
+            UPDATE rental_customer c
+               SET rental_count = COALESCE(s.count, 0) + COALESCE(c.archived_rental_count, 0),
+                   total_spent = COALESCE(s.spent, 0) + COALESCE(c.archived_total_spent, 0),
+                   last_rental_date = GREATEST(s.last_date, c.archived_last_rental_date)
+              FROM rental_customer c2
+         LEFT JOIN (
+                SELECT customer_id, COUNT(*) AS count, SUM(total_price) AS spent, MAX(start_date) AS last_date
+                  FROM rental_order
+                 WHERE active AND state IN ('confirmed', 'done')
+              GROUP BY customer_id
+             ) s ON s.customer_id = c2.id
+             WHERE c.id = c2.id
+        """)
+        self.env['rental.customer']._cron_reconcile_outstanding_balances()
+        self.env.invalidate_all()
+    
+    @api.model
+    def _purge_data(self):
+        """Delete the generated records (never the shop's own, which use the sequence prefixes)"""
+        cr = self.env.cr
+        self.env.flush_all()
+        cr.execute("DELETE FROM rental_payment WHERE order_id IN "
+                   "(SELECT id FROM rental_order WHERE name LIKE %s)", [f'{BENCH_ORDER_PREFIX}%'])
+        cr.execute("DELETE FROM rental_order WHERE name LIKE %s", [f'{BENCH_ORDER_PREFIX}%'])
+        cr.execute("DELETE FROM rental_order WHERE customer_id IN "
+                   "(SELECT id FROM rental_customer WHERE customer_code LIKE %s)", [f'{BENCH_CUSTOMER_PREFIX}%'])
+        cr.execute("DELETE FROM rental_customer WHERE customer_code LIKE %s", [f'{BENCH_CUSTOMER_PREFIX}%'])
+        cr.execute("DELETE FROM rental_product WHERE product_code LIKE %s", [f'{BENCH_PRODUCT_PREFIX}%'])
+        self._rebuild_statistics()
+    
+    # ======== BENCHMARKS ========
+    
+    @api.model
+    def _benchmark_check_availability(self, sample):
+        """check_availability over 200 products, one month ahead"""
+        start = fields.Date.context_today(self) + timedelta(days=7)
+        for product in sample['products'][:200]:
+            product.check_availability(start, start + timedelta(days=30))
+    
+    @api.model
+    def _benchmark_action_confirm(self, sample):
+        """Create and confirm 100 draft orders on free future dates, for customers without credit limit"""
+        orders = self._bench_order_batch(
+            dict(sample, customers=sample['customers'].filtered(lambda c: not c.credit_limit)), 100, 'draft')
+        orders.action_confirm()
+        if orders.filtered(lambda o: o.state != 'confirmed'):
+            raise UserError("Benchmark action_confirm: the draft orders were not all confirmed!")
+    
+    @api.model
+    def _benchmark_order_create(self, sample):
+        """Create 1000 draft orders in one batch"""
+        self._bench_order_batch(sample, 1000, 'draft')
+    
+    @api.model
+    def _benchmark_customer_list(self, sample):
+        """Load a customer list page and recompute its rental statistics"""
+        Customer = self.env['rental.customer']
+        records = Customer.search_read([], ['customer_code', 'name', 'email', 'phone', 'rental_count',
+                                            'total_spent', 'outstanding_balance'], limit=80)
+        customers = Customer.browse([record['id'] for record in records])
+        self.env.add_to_compute(Customer._fields['rental_count'], customers)
+        customers.flush_recordset()
+    
+    @api.model
+    def _benchmark_product_list(self, sample):
+        """Load a product list page with its statistics"""
+        self.env['rental.product'].search_read([], ['product_code', 'name', 'status', 'price_per_day',
+                                                    'rental_count', 'total_revenue', 'utilization_rate'], limit=80)
+    
+    @api.model
+    def _benchmark_payment_posting(self, sample):
+        """Post 500 payments on orders with an amount due"""
+        orders = self.env['rental.order'].search(
+            [('state', 'in', EXPOSURE_STATES), ('remaining_amount', '>', 1)], limit=500)
+        self.env['rental.payment'].create([
+            {'order_id': order.id, 'amount': 1.0, 'payment_method': 'cash'} for order in orders
+        ])
+    
+    @api.model
+    def _bench_order_batch(self, sample, count, state):
+        """Create count orders far enough ahead that they never collide with the history"""
+        start = fields.Date.context_today(self) + timedelta(days=BENCH_FUTURE_DAYS + 30)
+        customers, products = sample['customers'], sample['products']
+        return self.env['rental.order'].create([{
+            'customer_id': customers[index % len(customers)].id,
+            'product_id': products[index % len(products)].id,
+            'start_date': start + timedelta(days=(index // len(products)) * 10),
+            'end_date': start + timedelta(days=(index // len(products)) * 10 + 3),
+            'state': state,
+        } for index in range(count)])
+    
+    @api.model
+    def _get_benchmarks(self):
+        """Return {name: method} for every _benchmark_* method"""
+        return {
+            name[len('_benchmark_'):]: getattr(self, name)
+            for name in dir(type(self)) if name.startswith('_benchmark_')
+        }
+    
+    @api.model
+    def _get_baselines_path(self):
+        """Return the JSON file holding the baselines (rental_management.benchmark_baselines_path)"""
+        return self.env['ir.config_parameter'].sudo().get_param(
+            'rental_management.benchmark_baselines_path',
+            os.path.join(config['data_dir'], 'rental_benchmark_baselines.json'))
+    
+    @api.model
+    def _run_benchmarks(self, names=None, update_baselines=False, seed=42):
+        """Time every benchmark and compare it with the stored baselines.
+        
+        Each benchmark runs BENCH_REPEAT times in a savepoint rolled back
+        afterwards; the fastest wall time and the query count (cr.sql_log_count)
+        are kept. A benchmark issuing more queries than its baseline, or running
+        BENCH_TIME_TOLERANCE slower, is a regression: they are all raised
+        together. With update_baselines, the results become the new baselines.
+        
+        Returns {name: {'queries': count, 'seconds': wall time}}.
+        """
+        rng = random.Random(seed)
+        Customer, Product = self.env['rental.customer'], self.env['rental.product']
+        customer_ids = Customer.search([], limit=5000).ids
+        product_ids = Product.search([('status', '=', 'available')], limit=5000).ids
+        if not customer_ids or not product_ids:
+            raise UserError("Benchmarks need customers and available products, generate the data first!")
+        sample = {
+            'customers': Customer.browse(rng.sample(customer_ids, min(500, len(customer_ids)))),
+            'products': Product.browse(rng.sample(product_ids, min(500, len(product_ids)))),
+        }
+        benchmarks = self._get_benchmarks()
+        
+        results = {}
+        for name in names or sorted(benchmarks):
+            seconds, queries = [], 0
+            for _run in range(BENCH_REPEAT):
+                self.env.flush_all()
+                self.env.invalidate_all()
+                queries_before = self.env.cr.sql_log_count
+                started = time.perf_counter()
+                try:
+                    with self.env.cr.savepoint():
+                        benchmarks[name](sample)
+                        self.env.flush_all()
+                        seconds.append(time.perf_counter() - started)
+                        queries = self.env.cr.sql_log_count - queries_before
+                        raise BenchmarkRollback()
+                except BenchmarkRollback:
+                    self.env.invalidate_all()
+            results[name] = {'queries': queries, 'seconds': round(min(seconds), 4)}
+            _logger.info("Benchmark %s: %d queries, %.4fs", name, queries, min(seconds))
+        
+        path = self._get_baselines_path()
+        baselines = {}
+        if os.path.exists(path):
+            with open(path) as baselines_file:
+                baselines = json.load(baselines_file)
+        if update_baselines:
+            baselines.update(results)
+            with open(path, 'w') as baselines_file:
+                json.dump(baselines, baselines_file, indent=2, sort_keys=True)
+            return results
+        
+        regressions = []
+        for name, result in results.items():
+            baseline = baselines.get(name)
+            if not baseline:
+                continue
+            if result['queries'] > baseline['queries']:
+                regressions.append(f"{name}: {result['queries']} queries (baseline {baseline['queries']})")
+            if result['seconds'] > baseline['seconds'] * (1 + BENCH_TIME_TOLERANCE):
+                regressions.append(f"{name}: {result['seconds']:.4f}s (baseline {baseline['seconds']:.4f}s)")
+        if regressions:
+            raise UserError("Benchmark regressions:\n" + '\n'.join(regressions))
+        return results
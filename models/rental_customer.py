@@ -1,21 +1,54 @@
 # rental_customer.py - COMPLETE VERSION
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
+from odoo.tools import float_is_zero
+import logging
 import re
 
+from .rental_import import create_in_batches, split_lines
+from .rental_order import EXPOSURE_STATES
+from .rental_profiling import profiled
+
+_logger = logging.getLogger(__name__)
+
+# Compiled once, the constraints run them over whole create batches
+EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_STRIP_RE = re.compile(r'[\s\-\(\)]')
+
+
+def is_valid_email(email):
+    """Return whether email has a valid format"""
+    return bool(EMAIL_RE.match(email))
+
+
+def is_valid_phone(phone):
+    """Return whether phone holds at least 8 digits once spaces, dashes and brackets are removed"""
+    phone_clean = PHONE_STRIP_RE.sub('', phone)
+    return phone_clean.isdigit() and len(phone_clean) >= 8
+
+
 class RentalCustomer(models.Model):
     _name = "rental.customer"
+    _inherit = ["rental.sequence.mixin"]
     _description = "Rental Customer"
-    _rec_name = "name"
+    # Stored display name: lists read it in one go, autocompletion hits its trigram index
+    _rec_name = "complete_name"
     _order = "name"
     
+    _sequence_field = "customer_code"
+    _sequence_code = "rental.customer.code"
+    # Many2one autocompletion, each column served by its trigram index
+    _rec_names_search = ["complete_name", "email", "phone"]
+    
     # Basic Information (yang sudah ada di kode lama Anda)
-    name = fields.Char(string="Customer Name", required=True, index=True)
-    email = fields.Char(string="Email", required=True, index=True)
-    phone = fields.Char(string="Phone", required=True)
+    name = fields.Char(string="Customer Name", required=True, index='trigram')
+    complete_name = fields.Char(string="Display Name", compute="_compute_complete_name", store=True,
+                                index='trigram')
+    email = fields.Char(string="Email", required=True, index='trigram')
+    phone = fields.Char(string="Phone", required=True, index='trigram')
     
     # Additional Professional Fields (TAMBAHAN BARU)
-    customer_code = fields.Char(string="Customer Code", readonly=True, copy=False)
+    customer_code = fields.Char(string="Customer Code", readonly=True, copy=False, index='trigram')
     address = fields.Text(string="Address")
     city = fields.Char(string="City")
     state = fields.Char(string="State")
@@ -37,14 +70,21 @@ class RentalCustomer(models.Model):
     
     # Credit and Financial (TAMBAHAN BARU)
     credit_limit = fields.Float(string="Credit Limit", default=0.0)
+    # Maintained by delta from orders and payments (see RentalOrder._apply_balance_change)
+    outstanding_balance = fields.Float(string="Outstanding Balance", readonly=True, default=0.0, copy=False)
     
     # Relationship with orders (TAMBAHAN BARU)
     rental_order_ids = fields.One2many('rental.order', 'customer_id', string="Rental Orders")
     rental_count = fields.Integer(string="Total Rentals", compute="_compute_rental_stats", store=True)
     
+    # Rollups of the archived orders (see _refresh_archived_rollups), added to the statistics
+    archived_rental_count = fields.Integer(string="Archived Rentals", readonly=True, default=0, copy=False)
+    archived_total_spent = fields.Float(string="Archived Spent", readonly=True, default=0.0, copy=False)
+    archived_last_rental_date = fields.Date(string="Archived Last Rental", readonly=True, copy=False)
+    
     # Computed Fields (TAMBAHAN BARU)
-    total_spent = fields.Float(string="Total Spent", compute="_compute_rental_stats")
-    last_rental_date = fields.Date(string="Last Rental", compute="_compute_rental_stats")
+    total_spent = fields.Float(string="Total Spent", compute="_compute_rental_stats", store=True)
+    last_rental_date = fields.Date(string="Last Rental", compute="_compute_rental_stats", store=True)
     
     # Customer Rating (TAMBAHAN BARU)
     rating = fields.Selection([
@@ -55,46 +95,172 @@ class RentalCustomer(models.Model):
         ('5', 'Excellent')
     ], string="Customer Rating", default='3')
     
-    @api.model
-    def create(self, vals):
-        """Generate customer code when creating new customer"""
-        if not vals.get('customer_code'):
-            vals['customer_code'] = self.env['ir.sequence'].next_by_code('rental.customer.code') or 'CUST0001'
-        return super(RentalCustomer, self).create(vals)
-    
-    @api.depends('rental_order_ids')
+    @api.depends('rental_order_ids.state', 'rental_order_ids.total_price', 'rental_order_ids.start_date',
+                 'archived_rental_count', 'archived_total_spent', 'archived_last_rental_date')
+    @profiled
     def _compute_rental_stats(self):
-        """Compute rental statistics"""
+        """Compute rental statistics with one grouped query over the active orders of the whole
+        recordset, plus the rollups of the archived ones"""
+        stats = {}
+        if self._origin.ids:
+            stats = {
+                customer.id: (count, total_spent, last_rental_date)
+                for customer, count, total_spent, last_rental_date in self.env['rental.order']._read_group(
+                    [('customer_id', 'in', self._origin.ids), ('state', 'in', ['confirmed', 'done'])],
+                    ['customer_id'], ['__count', 'total_price:sum', 'start_date:max'],
+                )
+            }
         for customer in self:
-            orders = customer.rental_order_ids.filtered(lambda o: o.state in ['confirmed', 'done'])
-            customer.rental_count = len(orders)
-            customer.total_spent = sum(orders.mapped('total_price'))
-            
-            if orders:
-                customer.last_rental_date = max(orders.mapped('start_date') or [False])
-            else:
-                customer.last_rental_date = False
+            count, total_spent, last_rental_date = stats.get(customer._origin.id, (0, 0.0, False))
+            customer.rental_count = count + customer.archived_rental_count
+            customer.total_spent = total_spent + customer.archived_total_spent
+            customer.last_rental_date = max(filter(None, [last_rental_date, customer.archived_last_rental_date]),
+                                            default=False)
     
     @api.constrains('email')
+    @profiled
     def _check_email_format(self):
         """Validate email format"""
-        for customer in self:
-            if customer.email:
-                email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-                if not re.match(email_pattern, customer.email):
-                    raise ValidationError("Invalid email format!")
+        invalid = self.filtered(lambda c: c.email and not is_valid_email(c.email))
+        if invalid:
+            raise ValidationError(f"Invalid email format: {', '.join(invalid.mapped('email'))}!")
     
     @api.constrains('phone')
+    @profiled
     def _check_phone_format(self):
         """Basic phone validation"""
-        for customer in self:
-            if customer.phone:
-                # Remove spaces and special characters for validation
-                phone_clean = re.sub(r'[\s\-\(\)]', '', customer.phone)
-                if not phone_clean.isdigit() or len(phone_clean) < 8:
-                    raise ValidationError("Phone number must contain at least 8 digits!")
+        invalid = self.filtered(lambda c: c.phone and not is_valid_phone(c.phone))
+        if invalid:
+            raise ValidationError(f"Phone number must contain at least 8 digits: {', '.join(invalid.mapped('phone'))}!")
+    
+    @api.model
+    def import_lines(self, lines, batch_size=1000):
+        """Create customers in bulk.
+        
+        Each line is a dict with name, email, phone and optionally customer_code,
+        customer_type, company_name, address, city, state, zip_code, country,
+        credit_limit and notes. Lines are validated in one pass with the compiled
+        email and phone patterns and against the codes already in use (one
+        query), then created batch_size at a time.
+        
+        Returns {'imported': count, 'rejected': [(line index, reason), ...]}.
+        """
+        entries, rejected = split_lines(lines)
+        codes = {line.get('customer_code') for _index, line in entries if line.get('customer_code')}
+        known_codes = {customer['customer_code'] for customer in self.with_context(active_test=False).search_read(
+            [('customer_code', 'in', list(codes))], ['customer_code'])}
+        
+        rows = []
+        for index, line in entries:
+            name, email, phone = (str(line.get(key) or '').strip() for key in ('name', 'email', 'phone'))
+            code = line.get('customer_code') or False
+            customer_type = line.get('customer_type') or 'individual'
+            try:
+                credit_limit = float(line.get('credit_limit') or 0.0)
+            except (TypeError, ValueError):
+                rejected.append((index, f"Invalid credit limit '{line.get('credit_limit')}'"))
+                continue
+            if not name or not email or not phone:
+                rejected.append((index, "Name, email and phone are required"))
+            elif not is_valid_email(email):
+                rejected.append((index, f"Invalid email format: {email}"))
+            elif not is_valid_phone(phone):
+                rejected.append((index, f"Phone number must contain at least 8 digits: {phone}"))
+            elif credit_limit < 0:
+                rejected.append((index, "Credit limit cannot be negative"))
+            elif customer_type not in ('individual', 'company'):
+                rejected.append((index, f"Invalid customer type '{customer_type}'"))
+            elif code and code in known_codes:
+                rejected.append((index, f"Customer code '{code}' already exists"))
+            else:
+                if code:
+                    known_codes.add(code)
+                rows.append((index, {
+                    'name': name,
+                    'email': email,
+                    'phone': phone,
+                    'customer_code': code,
+                    'customer_type': customer_type,
+                    'company_name': line.get('company_name') or False,
+                    'address': line.get('address') or False,
+                    'city': line.get('city') or False,
+                    'state': line.get('state') or False,
+                    'zip_code': line.get('zip_code') or False,
+                    'country': line.get('country') or False,
+                    'credit_limit': credit_limit,
+                    'notes': line.get('notes') or False,
+                }))
+        
+        imported, failed = create_in_batches(self, rows, batch_size)
+        if codes:
+            self._sync_sequence_with_codes()
+        return {'imported': imported, 'rejected': sorted(rejected + failed)}
+    
+    def _apply_balance_delta(self, deltas):
+        """Add {customer_id: amount} to the stored outstanding balances, in one UPDATE"""
+        deltas = {customer_id: delta for customer_id, delta in deltas.items()
+                  if not float_is_zero(delta, precision_digits=6)}
+        if not deltas:
+            return
+        self.flush_model(['outstanding_balance'])
+        self.env.cr.execute("""
+            UPDATE rental_customer c
+               SET outstanding_balance = COALESCE(c.outstanding_balance, 0) + d.delta
+              FROM unnest(%s::int[], %s::float8[]) AS d(id, delta)
+             WHERE c.id = d.id
+        """, [list(deltas), list(deltas.values())])
+        self.browse(list(deltas)).invalidate_recordset(['outstanding_balance'])
+    
+    def _refresh_archived_rollups(self):
+        """Recompute the archived rollups of self from their archived orders, in one UPDATE
+        served by rental_order_archived_customer_idx"""
+        if not self.ids:
+            return
+        self.env['rental.order'].flush_model(['customer_id', 'active', 'state', 'total_price', 'start_date'])
+        self.env.cr.execute("""
+            UPDATE rental_customer c
+               SET archived_rental_count = COALESCE(s.count, 0),
+                   archived_total_spent = COALESCE(s.spent, 0),
+                   archived_last_rental_date = s.last_date
+              FROM unnest(%s::int[]) AS ids(id)
+         LEFT JOIN (
+                SELECT customer_id, COUNT(*) AS count, SUM(total_price) AS spent, MAX(start_date) AS last_date
+                  FROM rental_order
+                 WHERE active IS NOT TRUE AND customer_id = ANY(%s) AND state IN ('confirmed', 'done')
+              GROUP BY customer_id
+             ) s ON s.customer_id = ids.id
+             WHERE c.id = ids.id
+        """, [self.ids, self.ids])
+        rollups = ['archived_rental_count', 'archived_total_spent', 'archived_last_rental_date']
+        self.invalidate_recordset(rollups)
+        self.modified(rollups)
+    
+    @api.model
+    def _cron_reconcile_outstanding_balances(self):
+        """Recompute every outstanding balance with one grouped query, fix and report the drifts"""
+        self.env['rental.order'].flush_model(['customer_id', 'state', 'remaining_amount'])
+        self.flush_model(['outstanding_balance'])
+        self.env.cr.execute("""
+            SELECT c.id, COALESCE(c.outstanding_balance, 0), COALESCE(s.due, 0)
+              FROM rental_customer c
+         LEFT JOIN (
+                SELECT customer_id, SUM(remaining_amount) AS due
+                  FROM rental_order
+                 WHERE state IN %s
+              GROUP BY customer_id
+             ) s ON s.customer_id = c.id
+             WHERE ABS(COALESCE(c.outstanding_balance, 0) - COALESCE(s.due, 0)) > 0.005
+        """, [EXPOSURE_STATES])
+        drifts = self.env.cr.fetchall()
+        if drifts:
+            self._apply_balance_delta({customer_id: due - stored for customer_id, stored, due in drifts})
+            _logger.warning("Outstanding balances: %d customer(s) drifted, corrected: %s", len(drifts),
+                            ', '.join(f"#{customer_id} {stored:.2f} -> {due:.2f}"
+                                      for customer_id, stored, due in drifts[:20]))
+        return {'drifted': len(drifts), 'drifts': drifts}
     
     @api.constrains('credit_limit')
+    @profiled
     def _check_credit_limit(self):
         """Validate credit limit"""
         for customer in self:
@@ -109,15 +275,24 @@ class RentalCustomer(models.Model):
             'res_model': 'rental.order',
             'view_mode': 'list, form',
             'domain': [('customer_id', '=', self.id)],
-            'context': {'default_customer_id': self.id},
+            'context': {'default_customer_id': self.id, 'active_test': False},
         }
     
-    def name_get(self):
-        """Custom display name"""
-        result = []
+    @api.depends('name', 'customer_code')
+    def _compute_complete_name(self):
+        """Compute the "[code] name" display name"""
         for customer in self:
-            name = customer.name
+            name = customer.name or ''
             if customer.customer_code:
                 name = f"[{customer.customer_code}] {name}"
-            result.append((customer.id, name))
-        return result
\ No newline at end of file
+            customer.complete_name = name
+    
+    @api.model
+    def _fill_complete_name(self):
+        """Rebuild every complete_name in one UPDATE (migrations and bulk loads written in SQL)"""
+        self.env.cr.execute("""
+            UPDATE rental_customer
+               SET complete_name = CASE WHEN customer_code IS NULL THEN '' ELSE '[' || customer_code || '] ' END
+                                   || name
+        """)
+        self.invalidate_model(['complete_name'])
\ No newline at end of file
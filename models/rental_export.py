@@ -0,0 +1,200 @@
+# rental_export.py
+import csv
+import io
+import tempfile
+
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+
+# Rows read per keyset page, the only rows held in memory at a time
+EXPORT_CHUNK_SIZE = 2000
+
+# export -> (model, table, date column filtered by date_from/date_to, [(header, column)])
+# Columns named *_id are many2ones, exported as the display name of the record
+EXPORTS = {
+    'orders': ('rental.order', 'rental_order', 'start_date', [
+        ("Order Number", 'name'),
+        ("Customer", 'customer_id'),
+        ("Product", 'product_id'),
+        ("Quantity", 'quantity'),
+        ("Start Date", 'start_date'),
+        ("End Date", 'end_date'),
+        ("Actual Return Date", 'actual_return_date'),
+        ("Rental Days", 'rental_days'),
+        ("Price per Day", 'price_per_day'),
+        ("Subtotal", 'subtotal'),
+        ("Tax Amount", 'tax_amount'),
+        ("Insurance Fee", 'insurance_fee'),
+        ("Late Fee", 'late_fee'),
+        ("Damage Fee", 'damage_fee'),
+        ("Security Deposit", 'deposit_amount'),
+        ("Total Price", 'total_price'),
+        ("Paid Amount", 'paid_amount'),
+        ("Remaining Amount", 'remaining_amount'),
+        ("Status", 'state'),
+        ("Payment Status", 'payment_status'),
+    ]),
+    'payments': ('rental.payment', 'rental_payment', 'payment_date', [
+        ("Date", 'payment_date'),
+        ("Order", 'order_id'),
+        ("Customer", 'customer_id'),
+        ("Amount", 'amount'),
+        ("Payment Method", 'payment_method'),
+        ("Reference", 'reference'),
+    ]),
+}
+
+# many2one column -> SQL giving the display names (stored complete_name) of a batch of ids
+DISPLAY_NAME_QUERIES = {
+    'customer_id': "SELECT id, complete_name FROM rental_customer WHERE id = ANY(%s)",
+    'product_id': "SELECT id, complete_name FROM rental_product WHERE id = ANY(%s)",
+    'order_id': "SELECT id, name FROM rental_order WHERE id = ANY(%s)",
+}
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+# Rows per XLSX worksheet (the format's limit), header included: longer exports continue on a new sheet
+XLSX_MAX_ROWS = 1048576
+
+
+class RentalExport(models.AbstractModel):
+    _name = 'rental.export'
+    _description = 'Rental Streaming Export'
+    
+    @api.model
+    def _check_export(self, export, file_format):
+        """Validate an export request before the response starts streaming"""
+        if export not in EXPORTS:
+            raise UserError(f"Unknown export '{export}'!")
+        if file_format not in EXPORT_FORMATS:
+            raise UserError(f"Unsupported export format '{file_format}'!")
+        self.env[EXPORTS[export][0]].check_access_rights('read')
+    
+    @api.model
+    def _stream_export(self, export, file_format, date_from=None, date_to=None):
+        """Return a generator of the export file's bytes.
+        
+        The generator runs after the request's cursor is closed, so it opens its
+        own. Rows are read with keyset pagination on id and written as they
+        come, with the display names of each page resolved in one query per
+        many2one column: memory stays flat whatever the number of rows. The
+        user's record rules and the selection labels are resolved here, with the
+        request's environment, and applied by the generator.
+        """
+        self._check_export(export, file_format)
+        try:
+            date_from, date_to = fields.Date.to_date(date_from), fields.Date.to_date(date_to)
+        except ValueError:
+            raise UserError("Export dates must be formatted as YYYY-MM-DD!")
+        model = self.env[EXPORTS[export][0]].with_context(active_test=False)
+        rules = None
+        if not self.env.su:
+            query = model._where_calc([])
+            model._apply_ir_rules(query, 'read')
+            if query.where_clause:
+                rules = query.subselect()
+        labels = {
+            column: dict(model._fields[column]._description_selection(self.env))
+            for _header, column in EXPORTS[export][3]
+            if model._fields[column].type == 'selection'
+        }
+        registry = self.env.registry
+        rows = self._iter_export_rows(registry, export, date_from, date_to, rules=rules, labels=labels)
+        if file_format == 'xlsx':
+            return self._stream_xlsx(rows)
+        return self._stream_csv(rows)
+    
+    @api.model
+    def _iter_export_rows(self, registry, export, date_from, date_to, rules=None, labels=None):
+        """Yield the header, then every row of export as a list of values.
+        
+        rules is the SQL subquery of the ids readable under the user's record
+        rules (None when unrestricted), labels maps selection columns to their
+        {value: label} dict.
+        """
+        _model, table, date_column, columns = EXPORTS[export]
+        labels = labels or {}
+        yield [header for header, _column in columns]
+        
+        filters, params = [], []
+        if date_from:
+            filters.append(f"{date_column} >= %s")
+            params.append(date_from)
+        if date_to:
+            filters.append(f"{date_column} <= %s")
+            params.append(date_to)
+        if rules is not None:
+            filters.append(f"id IN ({rules.code})")
+            params.extend(rules.params)
+        select = ', '.join(column for _header, column in columns)
+        query = f"""
+            SELECT id, {select} FROM {table}
+             WHERE id > %s {''.join(f' AND {f}' for f in filters)}
+          ORDER BY id
+             LIMIT %s
+        """
+        many2ones = [index for index, (_header, column) in enumerate(columns) if column in DISPLAY_NAME_QUERIES]
+        selections = [(index, labels[column]) for index, (_header, column) in enumerate(columns) if column in labels]
+        
+        with registry.cursor() as cr:
+            last_id = 0
+            while True:
+                cr.execute(query, [last_id, *params, EXPORT_CHUNK_SIZE])
+                page = cr.fetchall()
+                if not page:
+                    break
+                last_id = page[-1][0]
+                names = {}
+                for index in many2ones:
+                    ids = list({row[index + 1] for row in page if row[index + 1]})
+                    cr.execute(DISPLAY_NAME_QUERIES[columns[index][1]], [ids])
+                    names[index] = dict(cr.fetchall())
+                for row in page:
+                    values = list(row[1:])
+                    for index, display_names in names.items():
+                        values[index] = display_names.get(values[index], '')
+                    for index, selection in selections:
+                        values[index] = selection.get(values[index], values[index] or '')
+                    yield values
+    
+    @api.model
+    def _stream_csv(self, rows):
+        """Encode rows as UTF-8 CSV, one chunk of bytes per batch of rows"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        buffer.write('\ufeff')
+        for count, row in enumerate(rows, 1):
+            writer.writerow(['' if value is None else value for value in row])
+            if count % EXPORT_CHUNK_SIZE == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode('utf-8')
+    
+    @api.model
+    def _stream_xlsx(self, rows):
+        """Write rows to a temporary workbook in constant-memory mode, then stream the file.
+        
+        Rows past XLSX_MAX_ROWS continue on a new worksheet starting with the header again.
+        """
+        import xlsxwriter
+        rows = iter(rows)
+        header = next(rows)
+        with tempfile.TemporaryFile() as output:
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+            sheet = workbook.add_worksheet()
+            sheet.write_row(0, 0, header)
+            row_index = 1
+            for row in rows:
+                if row_index == XLSX_MAX_ROWS:
+                    sheet = workbook.add_worksheet()
+                    sheet.write_row(0, 0, header)
+                    row_index = 1
+                # write_row signals errors (e.g. out of range) by its return value, never raises
+                if sheet.write_row(row_index, 0, ['' if value is None else value for value in row]) < 0:
+                    raise UserError(f"Row {row_index + 1} of sheet {sheet.name} could not be written!")
+                row_index += 1
+            workbook.close()
+            output.seek(0)
+            while block := output.read(64 * 1024):
+                yield block
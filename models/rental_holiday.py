@@ -0,0 +1,34 @@
+# rental_holiday.py
+from odoo import models, fields, api
+
+
+class RentalHoliday(models.Model):
+    _name = 'rental.holiday'
+    _description = 'Rental Holiday'
+    _order = 'date'
+    
+    name = fields.Char(string="Holiday", required=True)
+    date = fields.Date(string="Date", required=True, index=True)
+    
+    _sql_constraints = [
+        ('date_unique', 'UNIQUE(date)', 'There is already a holiday on this date!'),
+    ]
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Reset the cached holiday calendar of the pricing engine"""
+        holidays = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return holidays
+    
+    def write(self, vals):
+        """Reset the cached holiday calendar of the pricing engine"""
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+    
+    def unlink(self):
+        """Reset the cached holiday calendar of the pricing engine"""
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
@@ -0,0 +1,44 @@
+# rental_import.py
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
+
+
+def split_lines(lines):
+    """Return ([(line index, line), ...] for the dict lines, [(line index, reason), ...] for the others)"""
+    entries, rejected = [], []
+    for index, line in enumerate(lines):
+        if isinstance(line, dict):
+            entries.append((index, line))
+        else:
+            rejected.append((index, "Line is not a record"))
+    return entries, rejected
+
+
+def create_in_batches(model, rows, batch_size):
+    """Create the pre-validated rows [(line index, vals), ...] of model batch_size at a time.
+    
+    Each batch is one create call, so the sequence codes, the set-wise constraints
+    and the stored computations run once per batch. A batch failing a constraint
+    is rolled back to its savepoint and retried row by row to isolate the culprits.
+    Returns (created count, [(line index, reason), ...]).
+    """
+    created, rejected = 0, []
+    for batch in split_every(batch_size, rows, list):
+        try:
+            with model.env.cr.savepoint():
+                model.create([vals for _index, vals in batch])
+                model.env.flush_all()
+            created += len(batch)
+        except (ValidationError, UserError):
+            model.env.invalidate_all()
+            for index, vals in batch:
+                try:
+                    with model.env.cr.savepoint():
+                        model.create(vals)
+                        model.env.flush_all()
+                    created += 1
+                except (ValidationError, UserError) as error:
+                    model.env.invalidate_all()
+                    rejected.append((index, str(error.args[0] if error.args else error)))
+        model.env.invalidate_all()
+    return created, rejected
@@ -0,0 +1,94 @@
+# rental_maintenance.py
+from datetime import timedelta
+
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
+
+
+class RentalMaintenanceSlot(models.Model):
+    """Planned maintenance of a product, blocking its units like a booking"""
+    _name = 'rental.maintenance.slot'
+    _description = 'Rental Maintenance Slot'
+    _order = 'start_date, id'
+    
+    product_id = fields.Many2one('rental.product', string="Product", required=True, ondelete='cascade')
+    start_date = fields.Date(string="Start Date", required=True)
+    end_date = fields.Date(string="End Date", required=True)
+    quantity = fields.Integer(string="Units Blocked", default=1)
+    state = fields.Selection([
+        ('planned', 'Planned'),
+        ('done', 'Done'),
+        ('cancelled', 'Cancelled'),
+    ], string="Status", default='planned', required=True)
+    notes = fields.Text(string="Notes")
+    
+    def init(self):
+        """Counterpart of rental_order_availability_idx for the availability engine"""
+        create_index(
+            self.env.cr, 'rental_maintenance_slot_planned_idx', self._table,
+            ['product_id', 'start_date', 'end_date'], where="state = 'planned'",
+        )
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Planned slots change the occupancy timelines of their products"""
+        slots = super().create(vals_list)
+        slots.product_id._invalidate_occupancy()
+        return slots
+    
+    def write(self, vals):
+        """Invalidate the timelines of the products before and after the change"""
+        products_before = self.product_id
+        result = super().write(vals)
+        (products_before | self.product_id)._invalidate_occupancy()
+        return result
+    
+    def unlink(self):
+        """Deleted slots release their units"""
+        products = self.product_id
+        result = super().unlink()
+        products._invalidate_occupancy()
+        return result
+    
+    @api.constrains('start_date', 'end_date', 'quantity', 'product_id', 'state')
+    def _check_slot(self):
+        """Validate the period, that the product has no other planned maintenance at the same time
+        (overlapping slots would block its units twice) and that the blocked units are free of bookings"""
+        for slot in self:
+            if slot.end_date < slot.start_date:
+                raise ValidationError("Maintenance cannot end before it starts!")
+            if slot.quantity <= 0 or slot.quantity > slot.product_id.quantity:
+                raise ValidationError(f"Maintenance of '{slot.product_id.name}' must block between 1 and "
+                                      f"{slot.product_id.quantity} unit(s)!")
+        planned = self.filtered(lambda s: s.state == 'planned')
+        for slot in planned:
+            if self.search_count([
+                ('id', '!=', slot.id),
+                ('product_id', '=', slot.product_id.id),
+                ('state', '=', 'planned'),
+                ('start_date', '<=', slot.end_date),
+                ('end_date', '>=', slot.start_date),
+            ], limit=1):
+                raise ValidationError(f"Maintenance of '{slot.product_id.name}' overlaps another planned "
+                                      f"maintenance!")
+        for product, slots in planned.grouped('product_id').items():
+            peak_units = self.env['rental.order']._get_peak_booked_units(
+                product.ids, min(slots.mapped('start_date')), max(slots.mapped('end_date')))
+            if peak_units[product.id] > product.quantity:
+                raise ValidationError(f"Maintenance of '{product.name}' overlaps its bookings!")
+    
+    def action_done(self):
+        """Close the maintenance: the product's next due date restarts from its end"""
+        for slot in self:
+            slot.write({'state': 'done'})
+            slot.product_id.write({
+                'last_maintenance_date': slot.end_date,
+                'next_maintenance_date': slot.end_date + timedelta(days=slot.product_id.maintenance_interval_days),
+            })
+        return True
+    
+    def action_cancel(self):
+        """Release the blocked units"""
+        self.write({'state': 'cancelled'})
+        return True
@@ -1,16 +1,143 @@
 # rental_order.py - COMPLETE VERSION
+import logging
+import time
+
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools import split_every
+from odoo.tools.sql import create_index
+from collections import defaultdict
 from datetime import datetime, timedelta
 
+from .rental_import import create_in_batches, split_lines
+from .rental_pricing import total_price
+from .rental_profiling import profiled
+
+_logger = logging.getLogger(__name__)
+
+# States in which an order holds its product for the rental period
+BOOKED_STATES = ('confirmed', 'ongoing')
+# States in which the rented units are physically out of the warehouse
+OUT_STATES = ('ongoing', 'returned')
+# Fields whose change can alter what a done order adds to its product's statistics
+PRODUCT_STATISTICS_FIELDS = {
+    'state', 'product_id', 'start_date', 'end_date', 'actual_return_date', 'damage_fee', 'quantity',
+}
+
+# States in which the amount still due counts in the customer's outstanding balance
+EXPOSURE_STATES = ('confirmed', 'ongoing', 'returned', 'done')
+# Fields whose change can alter what an order adds to its customer's outstanding balance
+BALANCE_FIELDS = PRODUCT_STATISTICS_FIELDS | {'customer_id', 'late_fee'}
+# Fields whose change can alter the occupancy timeline of the product
+OCCUPANCY_FIELDS = {'state', 'product_id', 'start_date', 'end_date', 'quantity'}
+# Workflow transition -> (allowed source states, target state, error for the other states)
+TRANSITIONS = {
+    'confirm': (('draft',), 'confirmed', "Only draft orders can be confirmed!"),
+    'start': (('confirmed',), 'ongoing', "Only confirmed orders can be started!"),
+    'return': (('ongoing',), 'returned', "Only ongoing rentals can be returned!"),
+    'done': (('returned',), 'done', "Only returned rentals can be marked as done!"),
+    'cancel': (('draft', 'confirmed', 'ongoing', 'returned', 'cancelled'), 'cancelled',
+               "Cannot cancel completed rentals!"),
+}
+# Closed states an order must be in to be archived
+ARCHIVABLE_STATES = ('done', 'cancelled')
+# Fields whose change on an archived order can alter its customer's archived rollups
+ARCHIVE_ROLLUP_FIELDS = {'active', 'state', 'customer_id', 'start_date', 'total_price'}
+# Days after its end date before a closed order is archived (rental_management.archive_after_days)
+DEFAULT_ARCHIVE_AFTER_DAYS = 730
+# Scanned transition -> state of the orders it applies to, and their pick order for a serial number
+SCAN_TRANSITIONS = {
+    'start': ('confirmed', 'start_date'),
+    'return': ('ongoing', 'end_date'),
+}
+# Largest batch accepted by scan_transition
+MAX_SCAN_CODES = 500
+# Product statuses that can never be booked
+UNBOOKABLE_STATUSES = ('maintenance', 'damaged', 'retired')
+# Largest batch accepted by get_quotes
+MAX_QUOTE_LINES = 1000
+# Late fee charged per late day, as a share of the daily rate
+LATE_FEE_RATE = 0.5
+
+
+def late_fee_amount(end_date, return_date, price_per_day):
+    """Return the late fee owed for a rental due on end_date and returned (or still out) on return_date"""
+    if not end_date or not return_date or return_date <= end_date:
+        return 0.0
+    return (return_date - end_date).days * price_per_day * LATE_FEE_RATE
+
+
+def peak_booked_units(intervals, start_date, end_date):
+    """Return the highest number of units booked on any day of [start_date, end_date].
+    
+    intervals is an iterable of (start, end, quantity) tuples. Sweep over the
+    interval boundaries, so the cost is O(k log k) in the number of bookings
+    whatever the length of the period.
+    """
+    deltas = defaultdict(int)
+    for start, end, quantity in intervals:
+        start, end = max(start, start_date), min(end, end_date)
+        if start > end:
+            continue
+        deltas[start] += quantity
+        deltas[end + timedelta(days=1)] -= quantity
+    peak = booked = 0
+    for day in sorted(deltas):
+        booked += deltas[day]
+        peak = max(peak, booked)
+    return peak
+
+
+def booked_units_runs(intervals):
+    """Return the run-length occupancy of intervals: sorted (first_day, last_day, units) runs
+    of consecutive days with the same non-zero number of booked units."""
+    deltas = defaultdict(int)
+    for start, end, quantity in intervals:
+        deltas[start] += quantity
+        deltas[end + timedelta(days=1)] -= quantity
+    runs = []
+    booked = 0
+    days = sorted(deltas)
+    for day, next_day in zip(days, days[1:]):
+        booked += deltas[day]
+        if booked:
+            runs.append((day, next_day - timedelta(days=1), booked))
+    return runs
+
+
+def earliest_gap(runs, from_date, days):
+    """Return the first day on or after from_date starting days consecutive days without any
+    booked unit, runs being the sorted (first_day, last_day, units) runs of booked_units_runs"""
+    start = from_date
+    for first, last, _units in runs:
+        if last < start:
+            continue
+        if (first - start).days >= days:
+            break
+        start = last + timedelta(days=1)
+    return start
+
+
 class RentalOrder(models.Model):
     _name = "rental.order"
+    _inherit = ["rental.sequence.mixin"]
     _description = "Rental Order"
-    _rec_name = "name"
+    # Stored display name: lists read it in one go, autocompletion hits its trigram index
+    _rec_name = "complete_name"
     _order = "create_date desc"
     
+    _sequence_field = "name"
+    _sequence_code = "rental.order"
+    _sequence_placeholder = "New"
+    
+    _sql_constraints = [
+        ('name_unique', 'UNIQUE(name)', 'Order number must be unique!'),
+    ]
+    
     # Basic Information (YANG SUDAH ADA + TAMBAHAN)
-    name = fields.Char(string="Order Number", readonly=True, copy=False, default='New')
+    name = fields.Char(string="Order Number", readonly=True, copy=False, default='New', index='trigram')
+    complete_name = fields.Char(string="Display Name", compute="_compute_complete_name", store=True,
+                                index='trigram')
     customer_id = fields.Many2one("rental.customer", string="Customer", required=True)
     product_id = fields.Many2one("rental.product", string="Product", required=True)
     quantity = fields.Integer(string="Quantity", default=1)
@@ -31,6 +158,8 @@ class RentalOrder(models.Model):
     deposit_amount = fields.Float(string="Security Deposit", related='product_id.security_deposit', store=True)
     late_fee = fields.Float(string="Late Fee", compute="_compute_late_fee", store=True)
     damage_fee = fields.Float(string="Damage Fee", default=0.0)
+    is_overdue = fields.Boolean(string="Overdue", readonly=True, default=False, copy=False)
+    active = fields.Boolean(string="Active", default=True, copy=False)
     insurance_fee = fields.Float(string="Insurance Fee", compute="_compute_insurance_fee", store=True)
     
     # Workflow and Status (YANG SUDAH ADA + TAMBAHAN)
@@ -58,25 +187,128 @@ class RentalOrder(models.Model):
         ('partial', 'Partially Paid'),
         ('paid', 'Fully Paid'),
         ('refunded', 'Refunded')
-    ], string="Payment Status", default='unpaid')
+    ], string="Payment Status", compute="_compute_payment_amounts", store=True)
     
-    paid_amount = fields.Float(string="Paid Amount", default=0.0)
+    payment_ids = fields.One2many('rental.payment', 'order_id', string="Payments")
+    paid_amount = fields.Float(string="Paid Amount", compute="_compute_payment_amounts", store=True)
     remaining_amount = fields.Float(string="Remaining Amount", compute="_compute_remaining_amount", store=True)
     
+    def init(self):
+        """Index backing the availability engine (see _get_booked_intervals)"""
+        create_index(
+            self.env.cr, 'rental_order_availability_idx', self._table,
+            ['product_id', 'start_date', 'end_date'],
+            where="state IN ('confirmed', 'ongoing')",
+        )
+        create_index(
+            self.env.cr, 'rental_order_overdue_idx', self._table,
+            ['end_date'], where="state = 'ongoing'",
+        )
+        # Hot rows only: the default list order, and the archived rollups per customer
+        create_index(
+            self.env.cr, 'rental_order_active_idx', self._table,
+            ['create_date DESC'], where="active",
+        )
+        create_index(
+            self.env.cr, 'rental_order_archived_customer_idx', self._table,
+            ['customer_id'], where="active IS NOT TRUE",
+        )
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Count orders created directly as done (history imports) in their products' statistics
+        and customers' balances"""
+        orders = super(RentalOrder, self).create(vals_list)
+        orders.filtered(lambda o: o.state == 'done')._update_product_statistics(1)
+        orders._apply_balance_change({})
+        orders.filtered(lambda o: o.state in BOOKED_STATES).product_id._invalidate_occupancy()
+        return orders
+    
+    def write(self, vals):
+        """Keep the stored product statistics in step with orders entering or leaving 'done',
+        the customers' outstanding balances in step with the amounts due, and invalidate the
+        occupancy timelines of the products involved"""
+        products_before = self.product_id if OCCUPANCY_FIELDS.intersection(vals) else None
+        track_statistics = bool(PRODUCT_STATISTICS_FIELDS.intersection(vals))
+        archived_customers = (self.filtered(lambda o: not o.active).customer_id
+                              if ARCHIVE_ROLLUP_FIELDS.intersection(vals) else None)
+        balances_before = self._balance_contributions() if BALANCE_FIELDS.intersection(vals) else None
+        if track_statistics:
+            self.filtered(lambda o: o.state == 'done')._update_product_statistics(-1)
+        result = super(RentalOrder, self).write(vals)
+        if track_statistics:
+            self.filtered(lambda o: o.state == 'done')._update_product_statistics(1)
+        if balances_before is not None:
+            self._apply_balance_change(balances_before)
+        if products_before is not None:
+            (products_before | self.product_id)._invalidate_occupancy()
+        if archived_customers is not None:
+            archived_customers |= self.filtered(lambda o: not o.active).customer_id
+            archived_customers._refresh_archived_rollups()
+        return result
+    
+    def unlink(self):
+        """Remove deleted orders from their products' statistics and customers' balances"""
+        self.filtered(lambda o: o.state == 'done')._update_product_statistics(-1)
+        self.env['rental.customer']._apply_balance_delta(
+            {customer_id: -amount for customer_id, amount in self._balance_contributions().items()})
+        self.product_id._invalidate_occupancy()
+        self.env['rental.order.report']._forget_orders(self.ids)
+        archived_customers = self.filtered(lambda o: not o.active).customer_id
+        result = super(RentalOrder, self).unlink()
+        archived_customers._refresh_archived_rollups()
+        return result
+    
+    def _balance_contributions(self):
+        """Return {customer_id: amount still due} over the orders of self counted in the balance"""
+        contributions = defaultdict(float)
+        for order in self:
+            if order.state in EXPOSURE_STATES and order.customer_id:
+                contributions[order.customer_id.id] += order.remaining_amount
+        return contributions
+    
+    def _apply_balance_change(self, before):
+        """Move the customers' outstanding balances by the change of self's contributions since before"""
+        after = self._balance_contributions()
+        self.env['rental.customer']._apply_balance_delta({
+            customer_id: after.get(customer_id, 0.0) - before.get(customer_id, 0.0)
+            for customer_id in set(before) | set(after)
+        })
+    
+    def _update_product_statistics(self, sign):
+        """Add (sign=1) or remove (sign=-1) the done orders of self from their products' statistics"""
+        deltas = defaultdict(lambda: [0, 0, 0.0])
+        for order in self:
+            delta = deltas[order.product_id.id]
+            delta[0] += sign
+            delta[1] += sign * order.rental_days
+            delta[2] += sign * order.total_price
+        self.env['rental.product']._apply_rental_statistics_delta(deltas)
+    
+    @api.depends('name', 'customer_id.name', 'product_id.name')
+    def _compute_complete_name(self):
+        """Compute the "RO0001 - Customer (Product)" display name"""
+        for order in self:
+            name = f"{order.name} - {order.customer_id.name or ''}"
+            if order.product_id:
+                name = f"{name} ({order.product_id.name})"
+            order.complete_name = name
+    
     @api.model
-    def create(self, vals):
-        """Generate sequence number for new rental order"""
-        if vals.get('name', 'New') == 'New':
-            # Simple sequence - nanti bisa diganti dengan ir.sequence
-            last_order = self.search([], order='id desc', limit=1)
-            if last_order and last_order.name != 'New':
-                last_number = int(last_order.name.replace('RO', '') or '0')
-                vals['name'] = f'RO{str(last_number + 1).zfill(4)}'
-            else:
-                vals['name'] = 'RO0001'
-        return super(RentalOrder, self).create(vals)
+    def _fill_complete_name(self):
+        """Rebuild every complete_name in one UPDATE (migrations and bulk loads written in SQL)"""
+        self.env.cr.execute("""
+            UPDATE rental_order o
+               SET complete_name = o.name || ' - ' || COALESCE(c.name, '') || COALESCE(' (' || p.name || ')', '')
+              FROM rental_order o2
+         LEFT JOIN rental_customer c ON c.id = o2.customer_id
+         LEFT JOIN rental_product p ON p.id = o2.product_id
+             WHERE o.id = o2.id
+        """)
+        self.invalidate_model(['complete_name'])
     
     @api.depends('start_date', 'end_date')
+    @profiled
     def _compute_rental_days(self):
         """Compute rental days"""
         for order in self:
@@ -86,54 +318,81 @@ class RentalOrder(models.Model):
             else:
                 order.rental_days = 0
     
-    @api.depends('rental_days', 'price_per_day')
+    @api.depends('start_date', 'end_date', 'quantity', 'price_per_day', 'product_id.weekend_price',
+                 'product_id.holiday_price', 'product_id.price_per_week', 'product_id.price_per_month')
+    @profiled
     def _compute_subtotal(self):
-        """Compute subtotal"""
+        """Compute subtotal with the pricing engine (cheapest day/week/month combination)"""
+        pricing = self.env['rental.pricing']
         for order in self:
-            order.subtotal = order.rental_days * order.price_per_day
+            order.subtotal = pricing._price_interval(order.product_id, order.start_date, order.end_date,
+                                                     order.quantity)
     
     @api.depends('subtotal')
+    @profiled
     def _compute_tax_amount(self):
-        """Compute tax (example: 10% tax rate)"""
+        """Compute tax (rate from the rental_management.tax_rate system parameter)"""
+        tax_rate = self.env['rental.pricing']._get_tax_rate()
         for order in self:
-            tax_rate = 0.10  # 10% tax - bisa dibuat configurable nanti
             order.tax_amount = order.subtotal * tax_rate
     
-    @api.depends('rental_days', 'product_id.insurance_required', 'product_id.insurance_cost_per_day')
+    @api.depends('rental_days', 'quantity', 'product_id.insurance_required', 'product_id.insurance_cost_per_day')
+    @profiled
     def _compute_insurance_fee(self):
         """Compute insurance fee if required"""
+        pricing = self.env['rental.pricing']
         for order in self:
-            if order.product_id.insurance_required:
-                order.insurance_fee = order.rental_days * order.product_id.insurance_cost_per_day
-            else:
-                order.insurance_fee = 0.0
+            order.insurance_fee = pricing._insurance_fee(order.product_id, order.rental_days, order.quantity)
     
     @api.depends('subtotal', 'tax_amount', 'late_fee', 'damage_fee', 'insurance_fee')
+    @profiled
     def _compute_total_price(self):
         """Compute total price"""
         for order in self:
-            order.total_price = (order.subtotal + order.tax_amount + 
-                               order.late_fee + order.damage_fee + order.insurance_fee)
+            order.total_price = total_price(order.subtotal, order.tax_amount, order.insurance_fee,
+                                            order.late_fee, order.damage_fee)
+    
+    @api.depends('payment_ids.amount', 'total_price')
+    @profiled
+    def _compute_payment_amounts(self):
+        """Compute paid amount and payment status from the payment ledger, one SUM for the batch"""
+        totals = {}
+        if self._origin.ids:
+            totals = {
+                order.id: (paid, lowest)
+                for order, paid, lowest in self.env['rental.payment']._read_group(
+                    [('order_id', 'in', self._origin.ids)],
+                    ['order_id'], ['amount:sum', 'amount:min'],
+                )
+            }
+        for order in self:
+            paid, lowest = totals.get(order._origin.id, (0.0, 0.0))
+            order.paid_amount = paid
+            if paid <= 0:
+                order.payment_status = 'refunded' if lowest < 0 else 'unpaid'
+            elif paid >= order.total_price:
+                order.payment_status = 'paid'
+            else:
+                order.payment_status = 'partial'
     
     @api.depends('total_price', 'paid_amount')
+    @profiled
     def _compute_remaining_amount(self):
         """Compute remaining payment amount"""
         for order in self:
             order.remaining_amount = order.total_price - order.paid_amount
     
-    @api.depends('end_date', 'actual_return_date', 'price_per_day')
+    @api.depends('end_date', 'actual_return_date', 'price_per_day', 'state')
+    @profiled
     def _compute_late_fee(self):
-        """Compute late fee if returned late"""
+        """Compute late fee if returned late, or accrued so far if still out past the end date"""
+        today = fields.Date.context_today(self)
         for order in self:
-            if (order.actual_return_date and order.end_date and 
-                order.actual_return_date > order.end_date):
-                late_days = (order.actual_return_date - order.end_date).days
-                late_fee_per_day = order.price_per_day * 0.5  # 50% of daily rate as late fee
-                order.late_fee = late_days * late_fee_per_day
-            else:
-                order.late_fee = 0
+            return_date = order.actual_return_date or (order.state == 'ongoing' and today)
+            order.late_fee = late_fee_amount(order.end_date, return_date, order.price_per_day)
     
     @api.constrains('start_date', 'end_date')
+    @profiled
     def _check_dates(self):
         """Validate date logic"""
         for order in self:
@@ -141,93 +400,554 @@ class RentalOrder(models.Model):
                 if order.end_date <= order.start_date:
                     raise ValidationError("End date must be after start date!")
                 
-                # Check if start date is not in the past (except for draft state)
-                if order.state != 'draft' and order.start_date < fields.Date.today():
+                # Check if start date is not in the past (bookings only: started and closed
+                # orders, e.g. imported history, legitimately started in the past)
+                if order.state == 'confirmed' and order.start_date < fields.Date.today():
                     raise ValidationError("Start date cannot be in the past for confirmed orders!")
     
-    @api.constrains('product_id', 'start_date', 'end_date')
+    @api.constrains('product_id', 'start_date', 'end_date', 'quantity', 'state')
+    @profiled
     def _check_product_availability(self):
         """Check if product is available for the rental period"""
+        orders = self.filtered(lambda o: o.state in BOOKED_STATES)
+        conflicts = orders._get_capacity_conflicts()
+        if conflicts:
+            names = ', '.join(f"'{name}'" for name in conflicts.product_id.mapped('name'))
+            raise ValidationError(f"Product {names} is not available for the selected period!")
+    
+    @api.constrains('quantity')
+    @profiled
+    def _check_quantity(self):
+        """Validate rented quantity"""
         for order in self:
-            if (order.product_id and order.start_date and order.end_date and 
-                order.state not in ['cancelled', 'draft']):
-                # Find overlapping rentals for the same product
-                overlapping_orders = self.search([
-                    ('product_id', '=', order.product_id.id),
-                    ('id', '!=', order.id),
-                    ('state', 'in', ['confirmed', 'ongoing']),
-                    ('start_date', '<=', order.end_date),
-                    ('end_date', '>=', order.start_date)
-                ])
-                if overlapping_orders:
-                    raise ValidationError(f"Product '{order.product_id.name}' is not available for the selected period!")
-    
-    @api.constrains('paid_amount')
-    def _check_paid_amount(self):
-        """Validate paid amount"""
-        for order in self:
-            if order.paid_amount < 0:
-                raise ValidationError("Paid amount cannot be negative!")
-            if order.paid_amount > order.total_price:
-                raise ValidationError("Paid amount cannot exceed total price!")
-    
-    @api.onchange('paid_amount', 'total_price')
-    def _onchange_payment_status(self):
-        """Auto-update payment status based on paid amount"""
-        for order in self:
-            if order.paid_amount == 0:
-                order.payment_status = 'unpaid'
-            elif order.paid_amount >= order.total_price:
-                order.payment_status = 'paid'
+            if order.quantity <= 0:
+                raise ValidationError("Quantity must be at least 1!")
+    
+    @api.model
+    def import_lines(self, lines, batch_size=1000):
+        """Create orders in bulk, typically the history of a new branch.
+        
+        Each line is a dict with customer (customer code), product (product
+        code), start_date, end_date and optionally name, quantity, state
+        (default 'done'), actual_return_date and damage_fee. Customers and
+        products are resolved with one query each and lines are validated in
+        one pass, then created batch_size at a time: the capacity of the
+        booked ones is checked set-wise per batch, and the product statistics
+        and customer balances are updated by one delta per batch.
+        
+        Returns {'imported': count, 'rejected': [(line index, reason), ...]}.
+        """
+        entries, rejected = split_lines(lines)
+        
+        def code_map(model, code_field, key):
+            codes = list({line.get(key) for _index, line in entries if line.get(key)})
+            records = self.env[model].with_context(active_test=False).search_read(
+                [(code_field, 'in', codes)], [code_field])
+            return {record[code_field]: record['id'] for record in records}
+        
+        customer_ids = code_map('rental.customer', 'customer_code', 'customer')
+        product_ids = code_map('rental.product', 'product_code', 'product')
+        names = {line.get('name') for _index, line in entries if line.get('name')}
+        known_names = {order['name'] for order in self.with_context(active_test=False).search_read(
+            [('name', 'in', list(names))], ['name'])}
+        states = dict(self._fields['state'].selection)
+        
+        rows = []
+        for index, line in entries:
+            name = line.get('name') or False
+            state = line.get('state') or 'done'
+            try:
+                start_date = fields.Date.to_date(line.get('start_date'))
+                end_date = fields.Date.to_date(line.get('end_date'))
+                return_date = fields.Date.to_date(line.get('actual_return_date') or None) or False
+                quantity = int(line.get('quantity') or 1)
+                damage_fee = float(line.get('damage_fee') or 0.0)
+            except (TypeError, ValueError):
+                rejected.append((index, "Invalid date, quantity or damage fee"))
+                continue
+            if line.get('customer') not in customer_ids:
+                rejected.append((index, f"Unknown customer '{line.get('customer')}'"))
+            elif line.get('product') not in product_ids:
+                rejected.append((index, f"Unknown product '{line.get('product')}'"))
+            elif not start_date or not end_date or end_date <= start_date:
+                rejected.append((index, "End date must be after start date"))
+            elif quantity < 1:
+                rejected.append((index, "Quantity must be at least 1"))
+            elif state not in states:
+                rejected.append((index, f"Invalid status '{state}'"))
+            elif name and name in known_names:
+                rejected.append((index, f"Order '{name}' already exists"))
             else:
-                order.payment_status = 'partial'
+                if name:
+                    known_names.add(name)
+                rows.append((index, {
+                    'name': name or 'New',
+                    'customer_id': customer_ids[line['customer']],
+                    'product_id': product_ids[line['product']],
+                    'start_date': start_date,
+                    'end_date': end_date,
+                    'actual_return_date': return_date,
+                    'quantity': quantity,
+                    'damage_fee': damage_fee,
+                    'state': state,
+                }))
+        
+        imported, failed = create_in_batches(self, rows, batch_size)
+        if names:
+            self._sync_sequence_with_codes()
+        return {'imported': imported, 'rejected': sorted(rejected + failed)}
+    
+    # ======== AVAILABILITY ENGINE ========
+    
+    @api.model
+    def _get_booked_intervals(self, product_ids, start_date, end_date, exclude_order_ids=None,
+                              include_maintenance=True):
+        """Return {product_id: [(start, end, quantity), ...]} for the bookings
+        overlapping [start_date, end_date], planned maintenance slots included.
+        
+        Single query on rental_order_availability_idx (and its maintenance slot
+        counterpart), so the cost depends on the number of overlapping bookings
+        rather than on the product's order history.
+        """
+        intervals = defaultdict(list)
+        if not product_ids or not start_date or not end_date:
+            return intervals
+        self.flush_model(['product_id', 'state', 'start_date', 'end_date', 'quantity'])
+        maintenance = ""
+        if include_maintenance:
+            self.env['rental.maintenance.slot'].flush_model(['product_id', 'state', 'start_date', 'end_date', 'quantity'])
+            maintenance = """
+                UNION ALL
+                SELECT product_id, start_date, end_date, quantity
+                  FROM rental_maintenance_slot
+                 WHERE product_id = ANY(%(product_ids)s)
+                   AND state = 'planned'
+                   AND start_date <= %(end_date)s
+                   AND end_date >= %(start_date)s
+            """
+        self.env.cr.execute(f"""
+            SELECT product_id, start_date, end_date, quantity
+              FROM rental_order
+             WHERE product_id = ANY(%(product_ids)s)
+               AND state IN %(booked_states)s
+               AND start_date <= %(end_date)s
+               AND end_date >= %(start_date)s
+               AND id != ALL(%(exclude_ids)s)
+            {maintenance}
+        """, {
+            'product_ids': list(product_ids),
+            'booked_states': BOOKED_STATES,
+            'start_date': start_date,
+            'end_date': end_date,
+            'exclude_ids': list(exclude_order_ids or []),
+        })
+        for product_id, start, end, quantity in self.env.cr.fetchall():
+            intervals[product_id].append((start, end, quantity))
+        return intervals
+    
+    @api.model
+    def _get_peak_booked_units(self, product_ids, start_date, end_date, exclude_order_ids=None,
+                               include_maintenance=True):
+        """Return {product_id: peak units booked between start_date and end_date}"""
+        intervals = self._get_booked_intervals(product_ids, start_date, end_date, exclude_order_ids,
+                                               include_maintenance=include_maintenance)
+        return {
+            product_id: peak_booked_units(intervals.get(product_id, ()), start_date, end_date)
+            for product_id in product_ids
+        }
+    
+    @profiled
+    def _get_capacity_conflicts(self, assume_booked=False):
+        """Return the orders of self exceeding their product's capacity.
+        
+        Set-wise: the bookings of every product involved are fetched in one
+        query, then the orders are checked in sequence, each accepted booked
+        order counting against the following ones so conflicts inside self are
+        caught too. With assume_booked, every order of self is treated as a
+        booking (used when confirming drafts).
+        """
+        conflicts = self.browse()
+        orders = self.filtered(lambda o: o.product_id and o.start_date and o.end_date)
+        if not orders:
+            return conflicts
+        intervals = self._get_booked_intervals(
+            orders.product_id.ids, min(orders.mapped('start_date')), max(orders.mapped('end_date')),
+            exclude_order_ids=orders.ids,
+        )
+        for order in orders:
+            booked = intervals[order.product_id.id]
+            if peak_booked_units(booked, order.start_date, order.end_date) + order.quantity > order.product_id.quantity:
+                conflicts |= order
+            elif assume_booked or order.state in BOOKED_STATES:
+                booked.append((order.start_date, order.end_date, order.quantity))
+        return conflicts
+    
+    # ======== QUOTES ========
+    
+    @api.model
+    def get_quote(self, product_id, start_date, end_date, quantity=1):
+        """Price a prospective rental without creating an order (see get_quotes)"""
+        return self.get_quotes([{
+            'product_id': product_id, 'start_date': start_date, 'end_date': end_date, 'quantity': quantity,
+        }])[0]
+    
+    @api.model
+    def get_quotes(self, lines):
+        """Price and check availability of up to MAX_QUOTE_LINES prospective rentals.
+        
+        Read-only: nothing is written and no constraint runs. Each line is a dict
+        with product_id, start_date, end_date and quantity; each result holds the
+        price breakdown of the rental.order computes plus 'available', or an
+        'error' for an invalid line or a period refused by the product's booking
+        rules (the ones search_available applies). Products are read in one batch and the
+        bookings of all lines are fetched with one availability query.
+        """
+        if len(lines) > MAX_QUOTE_LINES:
+            raise UserError(f"A quote request accepts at most {MAX_QUOTE_LINES} lines!")
+        parsed = []
+        for line in lines:
+            if not isinstance(line, dict):
+                parsed.append({'error': "Invalid quote line."})
+                continue
+            try:
+                start_date = fields.Date.to_date(line.get('start_date'))
+                end_date = fields.Date.to_date(line.get('end_date'))
+                quantity = int(line.get('quantity') or 1)
+                product_id = int(line.get('product_id') or 0)
+            except (TypeError, ValueError):
+                parsed.append({'error': "Invalid product, quantity or date."})
+                continue
+            if not start_date or not end_date or end_date <= start_date:
+                parsed.append({'error': "End date must be after start date!"})
+            elif quantity <= 0:
+                parsed.append({'error': "Quantity must be at least 1!"})
+            else:
+                parsed.append({'product_id': product_id, 'start_date': start_date,
+                               'end_date': end_date, 'quantity': quantity})
+        
+        valid = [line for line in parsed if 'error' not in line]
+        products = self.env['rental.product'].browse({line['product_id'] for line in valid}).exists()
+        intervals = {}
+        if valid:
+            intervals = self._get_booked_intervals(
+                products.ids, min(line['start_date'] for line in valid), max(line['end_date'] for line in valid),
+            )
+        pricing = self.env['rental.pricing']
+        results = []
+        for line in parsed:
+            if 'error' in line:
+                results.append(line)
+                continue
+            product = products.browse(line['product_id'])
+            if product not in products:
+                results.append({'error': f"Unknown product {line['product_id']}."})
+                continue
+            if not product.active or product.status == 'retired':
+                # search_available never offers them either
+                results.append({'error': f"Product '{product.name}' is no longer rented."})
+                continue
+            start_date, end_date, quantity = line['start_date'], line['end_date'], line['quantity']
+            rule_error = product._get_booking_rule_error(start_date, end_date)
+            if rule_error:
+                results.append({'error': rule_error})
+                continue
+            peak = peak_booked_units(intervals.get(product.id, ()), start_date, end_date)
+            result = pricing._price_breakdown(product, start_date, end_date, quantity)
+            result.update({
+                'product_id': product.id,
+                'start_date': fields.Date.to_string(start_date),
+                'end_date': fields.Date.to_string(end_date),
+                'quantity': quantity,
+                'available': product.status not in UNBOOKABLE_STATUSES and peak + quantity <= product.quantity,
+                'available_quantity': max(product.quantity - peak, 0),
+            })
+            results.append(result)
+        return results
+    
+    # ======== SCHEDULED JOBS ========
+    
+    @api.model
+    def _cron_process_overdue_rentals(self, chunk_size=1000):
+        """Flag ongoing rentals past their end date and accrue their late fees.
+        
+        The overdue orders are found with one query on rental_order_overdue_idx,
+        then processed in chunks: the fees of a chunk are computed in one pass
+        over raw rows and written grouped by amount, and each chunk is committed
+        so a large run neither holds locks for long nor grows the ORM cache.
+        """
+        started = time.monotonic()
+        today = fields.Date.context_today(self)
+        self.flush_model(['state', 'end_date', 'is_overdue'])
+        
+        # Orders no longer overdue (returned, cancelled, end date moved)
+        self.env.cr.execute("""
+            SELECT id FROM rental_order
+             WHERE is_overdue AND NOT (state = 'ongoing' AND end_date < %s)
+        """, [today])
+        cleared_ids = [row[0] for row in self.env.cr.fetchall()]
+        if cleared_ids:
+            self.browse(cleared_ids).write({'is_overdue': False})
+        
+        self.env.cr.execute("""
+            SELECT id FROM rental_order
+             WHERE state = 'ongoing' AND end_date < %s
+          ORDER BY id
+        """, [today])
+        overdue_ids = [row[0] for row in self.env.cr.fetchall()]
+        
+        processed = 0
+        for chunk_ids in split_every(chunk_size, overdue_ids, list):
+            self.env.cr.execute("""
+                SELECT id, end_date, price_per_day, late_fee, is_overdue
+                  FROM rental_order
+                 WHERE id = ANY(%s)
+            """, [chunk_ids])
+            ids_by_fee = defaultdict(list)
+            for order_id, end_date, price_per_day, late_fee, is_overdue in self.env.cr.fetchall():
+                fee = late_fee_amount(end_date, today, price_per_day or 0.0)
+                if not is_overdue or fee != late_fee:
+                    ids_by_fee[fee].append(order_id)
+            for fee, order_ids in ids_by_fee.items():
+                self.browse(order_ids).write({'late_fee': fee, 'is_overdue': True})
+            self.env.flush_all()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            processed += len(chunk_ids)
+        
+        elapsed = time.monotonic() - started
+        _logger.info("Overdue rentals: %d processed, %d cleared in %.2fs", processed, len(cleared_ids), elapsed)
+        return {'processed': processed, 'cleared': len(cleared_ids), 'elapsed': elapsed}
+    
+    @api.model
+    def _cron_archive_orders(self, chunk_size=1000):
+        """Archive done and cancelled orders ended before the archive horizon.
+        
+        Orders are archived by chunks of ids, each committed with the archived
+        rollups of its customers, so an interrupted run resumes where it
+        stopped: archived orders no longer match the selection query.
+        """
+        started = time.monotonic()
+        after_days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'rental_management.archive_after_days', DEFAULT_ARCHIVE_AFTER_DAYS))
+        horizon = fields.Date.context_today(self) - timedelta(days=after_days)
+        self.flush_model(['state', 'end_date', 'active'])
+        self.env.cr.execute("""
+            SELECT id FROM rental_order
+             WHERE active AND state IN %s AND end_date < %s
+          ORDER BY id
+        """, [ARCHIVABLE_STATES, horizon])
+        order_ids = [row[0] for row in self.env.cr.fetchall()]
+        
+        archived = 0
+        for chunk in split_every(chunk_size, order_ids, self.browse):
+            chunk.write({'active': False})
+            self.env.flush_all()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            archived += len(chunk)
+        
+        elapsed = time.monotonic() - started
+        _logger.info("Order archival: %d order(s) ended before %s archived in %.2fs", archived, horizon, elapsed)
+        return {'archived': archived, 'horizon': horizon, 'elapsed': elapsed}
+    
+    def action_reprice(self):
+        """Server action: reprice the selected orders (e.g. after a holiday or tax change)"""
+        self._reprice()
+        return True
+    
+    def _reprice(self, chunk_size=5000):
+        """Recompute the pricing chain of self in chunks.
+        
+        The subtotal and insurance fee are marked for recomputation and their
+        dependents (tax, total, remaining, customer statistics) follow at the
+        flush, so each chunk is priced with the cached calendar and tax rate.
+        """
+        for chunk in split_every(chunk_size, self.ids, self.browse):
+            done = chunk.filtered(lambda o: o.state == 'done')
+            done._update_product_statistics(-1)
+            balances_before = chunk._balance_contributions()
+            for fname in ('subtotal', 'insurance_fee'):
+                self.env.add_to_compute(self._fields[fname], chunk)
+            chunk.modified(['subtotal', 'insurance_fee'])
+            self.env.flush_all()
+            done._update_product_statistics(1)
+            chunk._apply_balance_change(balances_before)
+            self.env.invalidate_all()
     
     # ======== WORKFLOW ACTIONS ========
     
     def action_confirm(self):
         """Confirm the rental order"""
-        for order in self:
-            if order.state != 'draft':
-                raise UserError("Only draft orders can be confirmed!")
-            
-            # Check product availability
-            if not order.product_id.check_availability(order.start_date, order.end_date):
-                raise UserError(f"Product '{order.product_id.name}' is not available for selected dates!")
-            
-            order.state = 'confirmed'
-            order.product_id.status = 'rented'
+        self._run_transition('confirm')
+        return True
     
     def action_start_rental(self):
         """Start the rental (when customer picks up)"""
-        for order in self:
-            if order.state != 'confirmed':
-                raise UserError("Only confirmed orders can be started!")
-            order.state = 'ongoing'
+        self._run_transition('start')
+        return True
     
     def action_return(self):
         """Mark as returned (when customer returns the item)"""
-        for order in self:
-            if order.state != 'ongoing':
-                raise UserError("Only ongoing rentals can be returned!")
-            order.actual_return_date = fields.Date.today()
-            order.state = 'returned'
+        self._run_transition('return')
+        return True
     
     def action_done(self):
         """Mark as done (complete the rental process)"""
-        for order in self:
-            if order.state != 'returned':
-                raise UserError("Only returned rentals can be marked as done!")
-            order.state = 'done'
-            order.product_id.status = 'available'
+        self._run_transition('done')
+        return True
     
     def action_cancel(self):
         """Cancel the rental order"""
+        self._run_transition('cancel')
+        return True
+    
+    @profiled
+    def batch_transition(self, transition):
+        """Apply transition to every order that allows it, without aborting on failures.
+        
+        Returns {'succeeded': [order ids], 'failed': {order id: reason}}.
+        """
+        return self._run_transition(transition, raise_on_error=False)
+    
+    def action_batch_transition(self, transition):
+        """Server action entry point: run batch_transition and notify the per-order report"""
+        report = self.batch_transition(transition)
+        failed = self.browse(list(report['failed']))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': f"{len(report['succeeded'])} order(s) processed, {len(failed)} failed",
+                'message': '\n'.join(f"{order.name}: {report['failed'][order.id]}" for order in failed)
+                           or "All selected orders were processed.",
+                'type': 'warning' if failed else 'success',
+                'sticky': bool(failed),
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+    
+    @profiled
+    def _run_transition(self, transition, raise_on_error=True):
+        """Validate transition for the whole recordset, then apply it to the valid orders"""
+        if transition not in TRANSITIONS:
+            raise UserError(f"Unknown rental order transition '{transition}'!")
+        failures = self._check_transition(transition)
+        if failures and raise_on_error:
+            raise UserError(next(iter(failures.values())))
+        valid = self.filtered(lambda o: o not in failures)
+        if valid:
+            valid._apply_transition(transition)
+        return {
+            'succeeded': valid.ids,
+            'failed': {order.id: reason for order, reason in failures.items()},
+        }
+    
+    def _check_transition(self, transition):
+        """Return {order: reason} for the orders of self that cannot go through transition.
+        
+        Availability of a batch of confirmations is checked set-wise, including
+        the conflicts between the orders of the batch.
+        """
+        sources, _target, message = TRANSITIONS[transition]
+        failures = {order: message for order in self if order.state not in sources}
+        if transition == 'confirm':
+            candidates = self.filtered(lambda o: o not in failures)
+            for order in candidates._get_capacity_conflicts(assume_booked=True):
+                failures[order] = f"Product '{order.product_id.name}' is not available for selected dates!"
+            candidates = candidates.filtered(lambda o: o not in failures)
+            for order in candidates._get_credit_limit_conflicts():
+                failures[order] = f"Credit limit of customer '{order.customer_id.name}' would be exceeded!"
+        return failures
+    
+    def _get_credit_limit_conflicts(self):
+        """Return the orders of self that would take their customer over the credit limit.
+        
+        Reads the stored outstanding balance (no scan of the customer's orders);
+        orders of the same customer are accepted in sequence. A zero credit
+        limit means no limit.
+        """
+        conflicts = self.browse()
+        exposure = {}
         for order in self:
-            if order.state in ['done']:
-                raise UserError("Cannot cancel completed rentals!")
-            order.state = 'cancelled'
-            if order.product_id.status == 'rented':
-                order.product_id.status = 'available'
+            customer = order.customer_id
+            if not customer.credit_limit:
+                continue
+            balance = exposure.get(customer.id, customer.outstanding_balance)
+            if balance + order.remaining_amount > customer.credit_limit:
+                conflicts |= order
+            else:
+                exposure[customer.id] = balance + order.remaining_amount
+        return conflicts
+    
+    @api.model
+    def scan_transition(self, transition, codes):
+        """Run transition ('start' or 'return') on the orders designated by scanned codes.
+        
+        A code is an order number or a product serial number; a serial number
+        designates the product's next order in the transition's source state
+        (earliest start to check out, earliest end to return), each repeated
+        scan of a pooled product taking the following one. Codes are resolved
+        with two indexed queries and the transition is applied by one
+        batch_transition. Returns [{'code', 'ok', 'order', 'state', 'error'}]
+        in scan order.
+        """
+        if transition not in SCAN_TRANSITIONS:
+            raise UserError(f"Unknown scan transition '{transition}'!")
+        if len(codes) > MAX_SCAN_CODES:
+            raise UserError(f"At most {MAX_SCAN_CODES} scans can be sent at once!")
+        state, pick_order = SCAN_TRANSITIONS[transition]
+        codes = [str(code).strip() for code in codes]
+        self.flush_model(['name', 'product_id', 'state', 'start_date', 'end_date'])
+        self.env['rental.product'].flush_model(['serial_number'])
+        self.env.cr.execute("""
+            SELECT name, id FROM rental_order WHERE name = ANY(%s)
+        """, [codes])
+        order_ids = dict(self.env.cr.fetchall())
+        self.env.cr.execute(f"""
+            SELECT p.serial_number, o.id
+              FROM rental_product p
+              JOIN rental_order o ON o.product_id = p.id AND o.state = %s
+             WHERE p.serial_number = ANY(%s)
+          ORDER BY o.{pick_order}, o.id
+        """, [state, [code for code in codes if code not in order_ids]])
+        serial_queues = defaultdict(list)
+        for serial_number, order_id in self.env.cr.fetchall():
+            serial_queues[serial_number].append(order_id)
+        
+        picked = []
+        for code in codes:
+            order_id = order_ids.get(code)
+            if not order_id and serial_queues.get(code):
+                order_id = serial_queues[code].pop(0)
+            picked.append(order_id)
+        orders = self.browse(list(dict.fromkeys(order_id for order_id in picked if order_id)))
+        report = orders.batch_transition(transition)
+        # Only the two columns of the payload are read back
+        summaries = {order['id']: order for order in orders.read(['name', 'state'])}
+        results = []
+        for code, order_id in zip(codes, picked):
+            if not order_id:
+                results.append({'code': code, 'ok': False, 'error': f"No {state} order for '{code}'"})
+                continue
+            results.append({
+                'code': code,
+                'ok': order_id in report['succeeded'],
+                'order': summaries[order_id]['name'],
+                'state': summaries[order_id]['state'],
+                'error': report['failed'].get(order_id),
+            })
+        return results
+    
+    def _apply_transition(self, transition):
+        """Move all orders of self through transition with one grouped write"""
+        vals = {'state': TRANSITIONS[transition][1]}
+        if transition == 'return':
+            vals.update(actual_return_date=fields.Date.today(), is_overdue=False)
+        self.write(vals)
+        if transition in ('start', 'done', 'cancel'):
+            self.product_id._refresh_rental_status()
     
     def action_reset_to_draft(self):
         """Reset to draft state"""
@@ -239,22 +959,11 @@ class RentalOrder(models.Model):
     
     def action_register_payment(self):
         """Open payment registration wizard"""
-        # Ini bisa dikembangkan nanti untuk payment wizard
         return {
             'type': 'ir.actions.act_window',
             'name': 'Register Payment',
-            'res_model': 'rental.payment.wizard',  # Model yang bisa dibuat nanti
+            'res_model': 'rental.payment.wizard',
             'view_mode': 'form',
             'target': 'new',
             'context': {'default_order_id': self.id}
         }
-    
-    def name_get(self):
-        """Custom display name"""
-        result = []
-        for order in self:
-            name = f"{order.name} - {order.customer_id.name}"
-            if order.product_id:
-                name = f"{name} ({order.product_id.name})"
-            result.append((order.id, name))
-        return result
\ No newline at end of file
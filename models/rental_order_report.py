@@ -0,0 +1,168 @@
+# rental_order_report.py
+import logging
+
+from odoo import models, fields, api
+
+_logger = logging.getLogger(__name__)
+
+# Orders written this long before the watermark are processed again, to catch
+# transactions that started before the previous refresh but committed after it
+REFRESH_OVERLAP = '10 minutes'
+
+
+class RentalOrderReport(models.Model):
+    """Rental analysis at day x product x customer x state grain.
+    
+    Stored in a plain table refreshed incrementally by _refresh_report: only the
+    (day, product, customer) cells touched by orders written since the last
+    refresh are recomputed, so dashboards never aggregate rental_order directly.
+    """
+    _name = 'rental.order.report'
+    _description = 'Rental Analysis'
+    _auto = False
+    _order = 'date desc'
+    
+    date = fields.Date(string="Start Date", readonly=True)
+    product_id = fields.Many2one('rental.product', string="Product", readonly=True)
+    customer_id = fields.Many2one('rental.customer', string="Customer", readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('confirmed', 'Confirmed'),
+        ('ongoing', 'Ongoing'),
+        ('returned', 'Returned'),
+        ('done', 'Done'),
+        ('cancelled', 'Cancelled')
+    ], string="Status", readonly=True)
+    order_count = fields.Integer(string="# Orders", readonly=True)
+    revenue = fields.Float(string="Revenue", readonly=True)
+    rental_days = fields.Integer(string="Rental Days", readonly=True)
+    unit_days = fields.Integer(string="Unit Days", readonly=True)
+    late_fee = fields.Float(string="Late Fees", readonly=True)
+    utilization = fields.Float(string="Utilization (%)", readonly=True, aggregator='avg')
+    
+    def init(self):
+        """Create the report table, the per-order source keys and the pending keys of deleted orders"""
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS rental_order_report (
+                id SERIAL PRIMARY KEY,
+                date DATE,
+                product_id INTEGER,
+                customer_id INTEGER,
+                state VARCHAR,
+                order_count INTEGER,
+                revenue DOUBLE PRECISION,
+                rental_days INTEGER,
+                unit_days INTEGER,
+                late_fee DOUBLE PRECISION,
+                utilization DOUBLE PRECISION
+            );
+            CREATE INDEX IF NOT EXISTS rental_order_report_cell_idx
+                ON rental_order_report (date, product_id, customer_id);
+            CREATE TABLE IF NOT EXISTS rental_order_report_source (
+                order_id INTEGER PRIMARY KEY,
+                date DATE,
+                product_id INTEGER,
+                customer_id INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS rental_order_report_pending (
+                date DATE,
+                product_id INTEGER,
+                customer_id INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS rental_order_report_watermark (
+                id INTEGER PRIMARY KEY DEFAULT 1 CHECK (id = 1),
+                watermark TIMESTAMP
+            );
+        """)
+    
+    @api.model
+    def _forget_orders(self, order_ids):
+        """Called before orders are deleted: queue their cells for the next refresh"""
+        self.env.cr.execute("""
+            WITH gone AS (
+                DELETE FROM rental_order_report_source WHERE order_id = ANY(%s)
+                RETURNING date, product_id, customer_id
+            )
+            INSERT INTO rental_order_report_pending SELECT * FROM gone
+        """, [list(order_ids)])
+    
+    @api.model
+    def _refresh_report(self):
+        """Bring the report up to date with the orders written since the watermark"""
+        self.env['rental.order'].flush_model()
+        cr = self.env.cr
+        # Kept in the report's own table: a system parameter write would clear every worker's caches
+        cr.execute("SELECT watermark FROM rental_order_report_watermark")
+        watermark = (cr.fetchone() or [None])[0]
+        cr.execute("SELECT NOW() AT TIME ZONE 'UTC'")
+        now = cr.fetchone()[0]
+        
+        cells_join = ""
+        if not watermark:
+            cr.execute("""
+                TRUNCATE rental_order_report, rental_order_report_source, rental_order_report_pending;
+                INSERT INTO rental_order_report_source (order_id, date, product_id, customer_id)
+                     SELECT id, start_date, product_id, customer_id FROM rental_order;
+            """)
+        else:
+            # Date, product and customer are required on orders: plain equi-joins use the indexes
+            cells_join = """
+                   JOIN rental_report_cells c
+                     ON o.start_date = c.date
+                    AND o.product_id = c.product_id
+                    AND o.customer_id = c.customer_id
+            """
+            cr.execute("""
+                CREATE TEMP TABLE rental_report_changed ON COMMIT DROP AS
+                     SELECT id FROM rental_order
+                      WHERE write_date >= %s::timestamp - INTERVAL %s;
+                CREATE TEMP TABLE rental_report_cells ON COMMIT DROP AS
+                     SELECT date, product_id, customer_id
+                       FROM rental_order_report_source
+                      WHERE order_id IN (SELECT id FROM rental_report_changed)
+                      UNION
+                     SELECT start_date, product_id, customer_id
+                       FROM rental_order
+                      WHERE id IN (SELECT id FROM rental_report_changed)
+                      UNION
+                     SELECT date, product_id, customer_id FROM rental_order_report_pending;
+                TRUNCATE rental_order_report_pending;
+                DELETE FROM rental_order_report_source
+                      WHERE order_id IN (SELECT id FROM rental_report_changed);
+                INSERT INTO rental_order_report_source (order_id, date, product_id, customer_id)
+                     SELECT id, start_date, product_id, customer_id
+                       FROM rental_order
+                      WHERE id IN (SELECT id FROM rental_report_changed);
+                ANALYZE rental_report_cells;
+                DELETE FROM rental_order_report r
+                      USING rental_report_cells c
+                      WHERE r.date = c.date
+                        AND r.product_id = c.product_id
+                        AND r.customer_id = c.customer_id;
+            """, [watermark, REFRESH_OVERLAP])
+        
+        cr.execute(f"""
+            INSERT INTO rental_order_report (date, product_id, customer_id, state, order_count, revenue,
+                                             rental_days, unit_days, late_fee, utilization)
+                 SELECT o.start_date, o.product_id, o.customer_id, o.state,
+                        COUNT(*),
+                        SUM(o.total_price),
+                        SUM(o.rental_days),
+                        SUM(o.rental_days * o.quantity),
+                        SUM(o.late_fee),
+                        SUM(o.rental_days * o.quantity) * 100.0
+                            / NULLIF(SUM(o.rental_days) * MAX(p.quantity), 0)
+                   FROM rental_order o
+                   {cells_join}
+              LEFT JOIN rental_product p ON p.id = o.product_id
+               GROUP BY o.start_date, o.product_id, o.customer_id, o.state
+        """)
+        refreshed = cr.rowcount
+        cr.execute("DROP TABLE IF EXISTS rental_report_changed, rental_report_cells")
+        cr.execute("""
+            INSERT INTO rental_order_report_watermark (id, watermark) VALUES (1, %s)
+            ON CONFLICT (id) DO UPDATE SET watermark = EXCLUDED.watermark
+        """, [now])
+        self.invalidate_model()
+        _logger.info("Rental analysis: %d row(s) refreshed", refreshed)
+        return refreshed
@@ -0,0 +1,137 @@
+# rental_payment.py
+from odoo import models, fields, api
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+from .rental_import import split_lines
+from .rental_order import EXPOSURE_STATES
+
+PAYMENT_METHODS = [
+    ('cash', 'Cash'),
+    ('bank_transfer', 'Bank Transfer'),
+    ('credit_card', 'Credit Card'),
+    ('debit_card', 'Debit Card'),
+]
+
+
+class RentalPayment(models.Model):
+    """Append-only payment ledger: rental.order.paid_amount is the sum of its lines"""
+    _name = 'rental.payment'
+    _description = 'Rental Payment'
+    _order = 'payment_date desc, id desc'
+    
+    order_id = fields.Many2one('rental.order', string='Rental Order', required=True, index=True,
+                               ondelete='restrict')
+    customer_id = fields.Many2one('rental.customer', string='Customer', related='order_id.customer_id',
+                                  store=True, index=True)
+    amount = fields.Float(string='Amount', required=True)
+    payment_date = fields.Date(string='Payment Date', required=True, default=fields.Date.context_today)
+    payment_method = fields.Selection(PAYMENT_METHODS, string='Payment Method', required=True, default='cash')
+    reference = fields.Char(string='Reference', index=True)
+    notes = fields.Text(string='Notes')
+    user_id = fields.Many2one('res.users', string='Registered By', default=lambda self: self.env.user)
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Check the payments against their orders, then move the customers' outstanding balances
+        by the amounts received"""
+        orders = self.env['rental.order'].browse({vals['order_id'] for vals in vals_list if vals.get('order_id')})
+        paid = {order.id: order.paid_amount for order in orders}
+        for vals in vals_list:
+            if not vals.get('order_id'):
+                continue
+            amount = vals.get('amount') or 0.0
+            error = self._get_payment_error(orders.browse(vals['order_id']), amount, paid[vals['order_id']])
+            if error:
+                raise UserError(f"{error}!")
+            paid[vals['order_id']] += amount
+        balances_before = orders._balance_contributions()
+        payments = super().create(vals_list)
+        orders._apply_balance_change(balances_before)
+        return payments
+    
+    @api.model
+    def _get_payment_error(self, order, amount, paid):
+        """Return why amount cannot be registered on order, already paid paid, or None.
+        
+        Only booked orders receive money, and the paid amount must stay between
+        zero and the total price; refunds (negative amounts) are accepted on
+        cancelled orders too.
+        """
+        if amount > 0 and order.state not in EXPOSURE_STATES:
+            return f"Order '{order.name}' is draft or cancelled and cannot be paid"
+        if paid + amount > order.total_price + 0.005:
+            return f"Payment would exceed the total price of order '{order.name}'"
+        if paid + amount < -0.005:
+            return f"Refund would exceed the amount paid on order '{order.name}'"
+        return None
+    
+    def write(self, vals):
+        """Payments are never modified: register a correcting (negative) payment instead"""
+        raise UserError("Payments cannot be modified, register a correcting payment instead!")
+    
+    def unlink(self):
+        """Payments are never deleted: register a correcting (negative) payment instead"""
+        raise UserError("Payments cannot be deleted, register a correcting payment instead!")
+    
+    @api.model
+    def import_statement_lines(self, lines, batch_size=5000):
+        """Register bank statement payments in bulk.
+        
+        Each line is a dict with order (order number), amount, and optionally
+        date, reference and payment_method. Orders are resolved with one query,
+        lines whose reference is already registered for the order are skipped,
+        payments the order cannot take (see _get_payment_error) are rejected,
+        and payments are inserted batch_size at a time, so the paid amounts of
+        a batch are recomputed by one grouped SUM.
+        
+        Returns {'imported': count, 'rejected': [(line index, reason), ...]}.
+        """
+        entries, rejected = split_lines(lines)
+        order_names = {line.get('order') for _index, line in entries if line.get('order')}
+        orders = self.env['rental.order'].with_context(active_test=False).search(
+            [('name', 'in', list(order_names))])
+        order_ids = {order.name: order.id for order in orders}
+        paid = {order.id: order.paid_amount for order in orders}
+        self.flush_model(['order_id', 'reference'])
+        self.env.cr.execute("""
+            SELECT order_id, reference FROM rental_payment
+             WHERE order_id = ANY(%s) AND reference IS NOT NULL
+        """, [list(order_ids.values())])
+        known_references = set(self.env.cr.fetchall())
+        
+        vals_list = []
+        for index, line in entries:
+            order_id = order_ids.get(line.get('order'))
+            reference = line.get('reference') or False
+            try:
+                amount = float(line.get('amount'))
+                payment_date = fields.Date.to_date(line.get('date')) or fields.Date.context_today(self)
+            except (TypeError, ValueError):
+                rejected.append((index, "Invalid amount or date"))
+                continue
+            if not order_id:
+                rejected.append((index, f"Unknown order '{line.get('order')}'"))
+            elif not amount:
+                rejected.append((index, "Amount cannot be zero"))
+            elif reference and (order_id, reference) in known_references:
+                rejected.append((index, f"Reference '{reference}' already registered"))
+            elif error := self._get_payment_error(orders.browse(order_id), amount, paid[order_id]):
+                rejected.append((index, error))
+            else:
+                paid[order_id] += amount
+                if reference:
+                    known_references.add((order_id, reference))
+                vals_list.append({
+                    'order_id': order_id,
+                    'amount': amount,
+                    'payment_date': payment_date,
+                    'reference': reference,
+                    'payment_method': line.get('payment_method') or 'bank_transfer',
+                })
+        
+        for batch in split_every(batch_size, vals_list, list):
+            self.create(batch)
+            self.env.flush_all()
+            self.env.invalidate_all()
+        return {'imported': len(vals_list), 'rejected': rejected}
@@ -0,0 +1,112 @@
+# rental_pricing.py
+from datetime import timedelta
+
+from odoo import models, api, tools
+
+# Days covered by the weekly and monthly tiers
+WEEK_DAYS = 7
+MONTH_DAYS = 30
+DEFAULT_TAX_RATE = 0.10
+
+
+def day_rate(day, rates, holidays):
+    """Return the rate of a single day: holiday rate, then weekend rate, then the daily rate"""
+    if rates['holiday_price'] and day in holidays:
+        return rates['holiday_price']
+    if rates['weekend_price'] and day.weekday() >= 5:
+        return rates['weekend_price']
+    return rates['price_per_day']
+
+
+def rental_price(rates, start_date, end_date, holidays):
+    """Return the cheapest price of one unit from start_date to end_date (both included).
+    
+    rates holds price_per_day, weekend_price, holiday_price, price_per_week and
+    price_per_month. Each day costs its own day rate unless it is covered by a
+    weekly (7 days) or monthly (30 days) block; best[i] is the cheapest price of
+    the first i days, so the combination is found in one linear pass.
+    """
+    if not start_date or not end_date or end_date < start_date:
+        return 0.0
+    days = (end_date - start_date).days + 1
+    week_price, month_price = rates['price_per_week'], rates['price_per_month']
+    best = [0.0] * (days + 1)
+    for i in range(1, days + 1):
+        best[i] = best[i - 1] + day_rate(start_date + timedelta(days=i - 1), rates, holidays)
+        if week_price and i >= WEEK_DAYS:
+            best[i] = min(best[i], best[i - WEEK_DAYS] + week_price)
+        if month_price and i >= MONTH_DAYS:
+            best[i] = min(best[i], best[i - MONTH_DAYS] + month_price)
+    return best[days]
+
+
+def total_price(subtotal, tax_amount, insurance_fee, late_fee=0.0, damage_fee=0.0):
+    """Return the total price of a rental from its components"""
+    return subtotal + tax_amount + late_fee + damage_fee + insurance_fee
+
+
+class RentalPricing(models.AbstractModel):
+    """Pricing engine shared by rental orders and quotes.
+    
+    The holiday calendar and the tax rate are cached per process (ormcache) and
+    invalidated when holidays or the system parameter change.
+    """
+    _name = 'rental.pricing'
+    _description = 'Rental Pricing Engine'
+    
+    @api.model
+    @tools.ormcache()
+    def _get_holiday_dates(self):
+        """Return the frozenset of holiday dates"""
+        holidays = self.env['rental.holiday'].sudo().search_read([], ['date'])
+        return frozenset(holiday['date'] for holiday in holidays)
+    
+    @api.model
+    @tools.ormcache()
+    def _get_tax_rate(self):
+        """Return the tax rate applied to rental subtotals"""
+        value = self.env['ir.config_parameter'].sudo().get_param('rental_management.tax_rate')
+        try:
+            return float(value) if value else DEFAULT_TAX_RATE
+        except ValueError:
+            return DEFAULT_TAX_RATE
+    
+    @api.model
+    def _get_product_rates(self, product):
+        """Return the rates of product as expected by rental_price"""
+        return {
+            'price_per_day': product.price_per_day,
+            'weekend_price': product.weekend_price,
+            'holiday_price': product.holiday_price,
+            'price_per_week': product.price_per_week,
+            'price_per_month': product.price_per_month,
+        }
+    
+    @api.model
+    def _price_interval(self, product, start_date, end_date, quantity=1):
+        """Return the rental price of quantity units of product over the period"""
+        rates = self._get_product_rates(product)
+        return rental_price(rates, start_date, end_date, self._get_holiday_dates()) * quantity
+    
+    @api.model
+    def _insurance_fee(self, product, rental_days, quantity=1):
+        """Return the insurance fee of quantity units of product for rental_days"""
+        if not product.insurance_required:
+            return 0.0
+        return rental_days * product.insurance_cost_per_day * quantity
+    
+    @api.model
+    def _price_breakdown(self, product, start_date, end_date, quantity=1):
+        """Return the full price of a prospective rental, as the rental.order computes would store it"""
+        rental_days = (end_date - start_date).days + 1 if end_date >= start_date else 0
+        subtotal = self._price_interval(product, start_date, end_date, quantity)
+        tax_amount = subtotal * self._get_tax_rate()
+        insurance_fee = self._insurance_fee(product, rental_days, quantity)
+        return {
+            'rental_days': rental_days,
+            'subtotal': subtotal,
+            'tax_amount': tax_amount,
+            'insurance_fee': insurance_fee,
+            'deposit_amount': product.security_deposit,
+            'total_price': total_price(subtotal, tax_amount, insurance_fee),
+        }
@@ -1,16 +1,68 @@
 # rental_product.py - COMPLETE VERSION
 from odoo import models, fields, api
-from odoo.exceptions import ValidationError
-from datetime import datetime, timedelta
+from odoo.exceptions import ValidationError, UserError
+from odoo.tools import split_every
+from odoo.tools.sql import create_index
+from datetime import date, datetime, timedelta
+import logging
+import time
+
+from odoo.tools.lru import LRU
+
+from .rental_import import create_in_batches, split_lines
+from .rental_order import (
+    BOOKED_STATES, EXPOSURE_STATES, OUT_STATES, UNBOOKABLE_STATUSES, booked_units_runs, earliest_gap,
+)
+from .rental_profiling import profiled
+
+_logger = logging.getLogger(__name__)
+
+# Products due for maintenance within this many days get a slot reserved
+MAINTENANCE_LOOKAHEAD_DAYS = 30
+
+# Resized copies of image_1920 derived by image.mixin, smallest first
+IMAGE_VARIANTS = ('image_128', 'image_256', 'image_512', 'image_1024')
+
+# Product prices the order subtotal and insurance fee depend on: changing them reprices the product's orders
+PRICING_FIELDS = {
+    'price_per_day', 'weekend_price', 'holiday_price', 'price_per_week', 'price_per_month',
+    'insurance_required', 'insurance_cost_per_day',
+}
+
+# SQL counterpart of _get_booking_rule_error, on rental_product p
+BOOKING_RULES_SQL = """COALESCE(p.min_rental_days, 1) <= %(rental_days)s
+               AND COALESCE(p.max_rental_days, %(rental_days)s) >= %(rental_days)s
+               AND %(start_date)s >= %(today)s::date + COALESCE(p.advance_booking_days, 0)"""
+
+# Per-process occupancy timelines: (dbname, product_id) -> ((occupancy_version, row xmin), runs)
+OCCUPANCY_CACHE = LRU(8192)
+
+# SQL counterpart of _compute_utilization_rate, {days} being the total rental days expression
+UTILIZATION_SQL = """CASE WHEN p.purchase_date < %(today)s
+                          THEN {days} * 100.0 / (%(today)s::date - p.purchase_date)
+                          ELSE 0 END"""
 
 class RentalProduct(models.Model):
     _name = 'rental.product'
+    _inherit = ['rental.sequence.mixin', 'image.mixin']
     _description = 'Rental Product'
-    _rec_name = "name"
+    # Stored display name: lists read it in one go, autocompletion hits its trigram index
+    _rec_name = "complete_name"
     _order = "name"
     
+    _sequence_field = 'product_code'
+    _sequence_code = 'rental.product.code'
+    # Many2one autocompletion, each column served by its trigram index
+    _rec_names_search = ['complete_name', 'serial_number']
+    
+    _sql_constraints = [
+        ('product_code_unique', 'UNIQUE(product_code)', 'Product code must be unique!'),
+    ]
+    
     # Basic Information (yang sudah ada di kode lama Anda)
-    name = fields.Char(string="Product Name", required=True, index=True)
+    name = fields.Char(string="Product Name", required=True, index='trigram')
+    complete_name = fields.Char(string="Display Name", compute="_compute_complete_name", store=True,
+                                index='trigram')
     description = fields.Text(string="Description")  # Ubah dari Text ke Html kalau mau rich text
     price_per_day = fields.Float(string="Price per day", required=True)
     status = fields.Selection([
@@ -22,10 +74,10 @@ class RentalProduct(models.Model):
     ], string="Status", default="available")
     
     # Additional Professional Fields (TAMBAHAN BARU)
-    product_code = fields.Char(string="Product Code", readonly=True, copy=False)
+    product_code = fields.Char(string="Product Code", readonly=True, copy=False, index='trigram')
     brand = fields.Char(string="Brand")
     model = fields.Char(string="Model")
-    serial_number = fields.Char(string="Serial Number", copy=False)
+    serial_number = fields.Char(string="Serial Number", copy=False, index='trigram')
     
     # Pricing Information (TAMBAHAN BARU)
     price_per_week = fields.Float(string="Price per Week", compute="_compute_weekly_price", store=True)
@@ -62,6 +114,8 @@ class RentalProduct(models.Model):
     last_maintenance_date = fields.Date(string="Last Maintenance Date")
     next_maintenance_date = fields.Date(string="Next Maintenance Date")
     maintenance_interval_days = fields.Integer(string="Maintenance Interval (Days)", default=365)
+    maintenance_duration_days = fields.Integer(string="Maintenance Duration (Days)", default=1)
+    maintenance_slot_ids = fields.One2many('rental.maintenance.slot', 'product_id', string="Maintenance Slots")
     
     # Purchase Information (TAMBAHAN BARU)
     purchase_date = fields.Date(string="Purchase Date")
@@ -71,10 +125,11 @@ class RentalProduct(models.Model):
     
     # Rental History and Statistics (TAMBAHAN BARU)
     rental_order_ids = fields.One2many('rental.order', 'product_id', string="Rental Orders")
-    rental_count = fields.Integer(string="Total Rentals", compute="_compute_rental_stats")
-    total_rental_days = fields.Integer(string="Total Rental Days", compute="_compute_rental_stats")
-    total_revenue = fields.Float(string="Total Revenue", compute="_compute_rental_stats")
-    utilization_rate = fields.Float(string="Utilization Rate (%)", compute="_compute_utilization_rate")
+    # Maintained by delta from rental.order (see RentalOrder._update_product_statistics)
+    rental_count = fields.Integer(string="Total Rentals", readonly=True, default=0)
+    total_rental_days = fields.Integer(string="Total Rental Days", readonly=True, default=0)
+    total_revenue = fields.Float(string="Total Revenue", readonly=True, default=0.0)
+    utilization_rate = fields.Float(string="Utilization Rate (%)", compute="_compute_utilization_rate", store=True)
     
     # Availability and Booking (TAMBAHAN BARU)
     min_rental_days = fields.Integer(string="Minimum Rental Days", default=1)
@@ -88,22 +143,35 @@ class RentalProduct(models.Model):
     
     # Internal notes (TAMBAHAN BARU)
     internal_notes = fields.Text(string="Internal Notes")
-    image_1920 = fields.Image("Image", max_width=1920, max_height=1920)
     quantity = fields.Integer(string="Quantity Available", default=1)
+    # Bumped whenever the product's bookings change, invalidates OCCUPANCY_CACHE in every worker
+    occupancy_version = fields.Integer(string="Occupancy Version", readonly=True, default=0, copy=False)
     
+    # Search-only field: "YYYY-MM-DD" or "YYYY-MM-DD..YYYY-MM-DD" (TAMBAHAN BARU)
+    available_period = fields.Char(string="Free Between", compute="_compute_available_period",
+                                   search="_search_available_period")
     
-    @api.model
-    def create(self, vals):
-        """Generate product code when creating new product"""
-        if not vals.get('product_code'):
-            # Simple sequence - nanti bisa diganti dengan ir.sequence
-            last_product = self.search([], order='id desc', limit=1)
-            if last_product and last_product.product_code:
-                last_number = int(last_product.product_code.replace('PROD', '') or '0')
-                vals['product_code'] = f'PROD{str(last_number + 1).zfill(4)}'
-            else:
-                vals['product_code'] = 'PROD0001'
-        return super(RentalProduct, self).create(vals)
+    
+    def init(self):
+        """Equality index for serial number scans (the trigram one serves fuzzy search)"""
+        create_index(self.env.cr, 'rental_product_serial_number_idx', self._table, ['serial_number'])
+    
+    def write(self, vals):
+        """A price change recomputes the stored totals of the products' orders without going
+        through RentalOrder.write: move the statistics and balances by the repricing here"""
+        if not PRICING_FIELDS.intersection(vals):
+            return super(RentalProduct, self).write(vals)
+        orders = self.env['rental.order'].with_context(active_test=False).search([
+            ('product_id', 'in', self.ids), ('state', 'in', EXPOSURE_STATES),
+        ])
+        done = orders.filtered(lambda o: o.state == 'done')
+        done._update_product_statistics(-1)
+        balances_before = orders._balance_contributions()
+        result = super(RentalProduct, self).write(vals)
+        self.env.flush_all()
+        done._update_product_statistics(1)
+        orders._apply_balance_change(balances_before)
+        return result
     
     @api.depends('price_per_day')
     def _compute_weekly_price(self):
@@ -117,25 +185,101 @@ class RentalProduct(models.Model):
         for product in self:
             product.price_per_month = product.price_per_day * 30 * 0.75  # 25% discount for monthly
     
-    @api.depends('rental_order_ids')
-    def _compute_rental_stats(self):
-        """Compute rental statistics"""
-        for product in self:
-            completed_orders = product.rental_order_ids.filtered(lambda o: o.state == 'done')
-            product.rental_count = len(completed_orders)
-            
-            # Compute total rental days
-            total_days = 0
-            for order in completed_orders:
-                if order.start_date and order.end_date:
-                    days = (order.end_date - order.start_date).days + 1
-                    total_days += days
-            product.total_rental_days = total_days
-            
-            # Compute total revenue
-            product.total_revenue = sum(completed_orders.mapped('total_price'))
+    def _apply_rental_statistics_delta(self, deltas):
+        """Add {product_id: (count, rental_days, revenue)} to the stored statistics.
+        
+        A single UPDATE for all products, which also refreshes utilization_rate
+        so the stored value stays consistent with the new total_rental_days.
+        """
+        deltas = {product_id: delta for product_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        self.flush_model(['rental_count', 'total_rental_days', 'total_revenue', 'utilization_rate', 'purchase_date'])
+        product_ids = list(deltas)
+        counts, days, revenues = zip(*(deltas[product_id] for product_id in product_ids))
+        self.env.cr.execute(f"""
+            UPDATE rental_product p
+               SET rental_count = COALESCE(p.rental_count, 0) + d.count,
+                   total_rental_days = COALESCE(p.total_rental_days, 0) + d.days,
+                   total_revenue = COALESCE(p.total_revenue, 0) + d.revenue,
+                   utilization_rate = {UTILIZATION_SQL.format(days='(COALESCE(p.total_rental_days, 0) + d.days)')}
+              FROM unnest(%(ids)s::int[], %(counts)s::int[], %(days)s::int[], %(revenues)s::float8[])
+                   AS d(id, count, days, revenue)
+             WHERE p.id = d.id
+        """, {
+            'ids': product_ids,
+            'counts': list(counts),
+            'days': list(days),
+            'revenues': list(revenues),
+            'today': fields.Date.context_today(self),
+        })
+        self.browse(product_ids).invalidate_recordset(
+            ['rental_count', 'total_rental_days', 'total_revenue', 'utilization_rate'])
+    
+    @api.model
+    def _recompute_rental_statistics(self):
+        """Rebuild the stored statistics of every product from its done orders (one grouped UPDATE)"""
+        self.env['rental.order'].flush_model(['product_id', 'state', 'rental_days', 'total_price'])
+        self.flush_model()
+        self.env.cr.execute(f"""
+            UPDATE rental_product p
+               SET rental_count = COALESCE(s.count, 0),
+                   total_rental_days = COALESCE(s.days, 0),
+                   total_revenue = COALESCE(s.revenue, 0),
+                   utilization_rate = {UTILIZATION_SQL.format(days='COALESCE(s.days, 0)')}
+              FROM rental_product p2
+         LEFT JOIN (
+                SELECT product_id, COUNT(*) AS count, SUM(rental_days) AS days, SUM(total_price) AS revenue
+                  FROM rental_order
+                 WHERE state = 'done'
+              GROUP BY product_id
+             ) s ON s.product_id = p2.id
+             WHERE p.id = p2.id
+        """, {'today': fields.Date.context_today(self)})
+        self.invalidate_model(['rental_count', 'total_rental_days', 'total_revenue', 'utilization_rate'])
+    
+    @api.model
+    def _cron_reconcile_rental_statistics(self):
+        """Recompute every product's statistics with one grouped query, fix and report the drifts"""
+        self.env['rental.order'].flush_model(['product_id', 'state', 'rental_days', 'total_price'])
+        self.flush_model(['rental_count', 'total_rental_days', 'total_revenue'])
+        self.env.cr.execute("""
+            SELECT p.id,
+                   COALESCE(p.rental_count, 0), COALESCE(p.total_rental_days, 0), COALESCE(p.total_revenue, 0),
+                   COALESCE(s.count, 0), COALESCE(s.days, 0), COALESCE(s.revenue, 0)
+              FROM rental_product p
+         LEFT JOIN (
+                SELECT product_id, COUNT(*) AS count, SUM(rental_days) AS days, SUM(total_price) AS revenue
+                  FROM rental_order
+                 WHERE state = 'done'
+              GROUP BY product_id
+             ) s ON s.product_id = p.id
+             WHERE COALESCE(p.rental_count, 0) != COALESCE(s.count, 0)
+                OR COALESCE(p.total_rental_days, 0) != COALESCE(s.days, 0)
+                OR ABS(COALESCE(p.total_revenue, 0) - COALESCE(s.revenue, 0)) > 0.005
+        """)
+        drifts = self.env.cr.fetchall()
+        if drifts:
+            self._apply_rental_statistics_delta({
+                product_id: (count - stored_count, days - stored_days, revenue - stored_revenue)
+                for product_id, stored_count, stored_days, stored_revenue, count, days, revenue in drifts
+            })
+            _logger.warning("Product statistics: %d product(s) drifted, corrected: %s", len(drifts),
+                            ', '.join(f"#{row[0]} {row[3]:.2f} -> {row[6]:.2f}" for row in drifts[:20]))
+        return {'drifted': len(drifts), 'drifts': drifts}
+    
+    @api.model
+    def _cron_refresh_utilization_rate(self):
+        """Nightly: move the days-owned denominator of utilization_rate to today, in one bulk UPDATE"""
+        self.flush_model(['total_rental_days', 'purchase_date', 'utilization_rate'])
+        self.env.cr.execute(f"""
+            UPDATE rental_product p
+               SET utilization_rate = {UTILIZATION_SQL.format(days='COALESCE(p.total_rental_days, 0)')}
+        """, {'today': fields.Date.context_today(self)})
+        self.invalidate_model(['utilization_rate'])
     
     @api.depends('total_rental_days', 'purchase_date')
+    @profiled
     def _compute_utilization_rate(self):
         """Compute utilization rate"""
         for product in self:
@@ -148,6 +292,22 @@ class RentalProduct(models.Model):
             else:
                 product.utilization_rate = 0
     
+    def _compute_available_period(self):
+        """Search-only field, never displayed"""
+        self.available_period = False
+    
+    def _search_available_period(self, operator, value):
+        """Restrict the search to products free for the typed period"""
+        if operator != '=' or not value:
+            raise UserError("Use 'YYYY-MM-DD' or 'YYYY-MM-DD..YYYY-MM-DD' to search free products.")
+        try:
+            start, _sep, end = value.strip().partition('..')
+            start_date = fields.Date.to_date(start.strip())
+            end_date = fields.Date.to_date(end.strip()) if end.strip() else start_date
+        except ValueError:
+            raise UserError(f"Invalid period '{value}': use 'YYYY-MM-DD..YYYY-MM-DD'.")
+        return [('id', 'in', self._get_available_product_ids(start_date, end_date))]
+    
     @api.constrains('price_per_day', 'security_deposit')
     def _check_pricing(self):
         """Validate pricing"""
@@ -166,12 +326,194 @@ class RentalProduct(models.Model):
             if product.max_rental_days < product.min_rental_days:
                 raise ValidationError("Maximum rental days must be greater than minimum rental days!")
     
+    @api.constrains('quantity')
+    def _check_quantity_bookings(self):
+        """Refuse to lower the quantity below the units booked by orders from today on (planned
+        maintenance slots are not bookings and do not hold the quantity up)"""
+        today = fields.Date.context_today(self)
+        peaks = self.env['rental.order']._get_peak_booked_units(
+            self.ids, today, date.max, include_maintenance=False)
+        for product in self:
+            if peaks[product.id] > product.quantity:
+                raise ValidationError(
+                    f"Product '{product.name}' has {peaks[product.id]} unit(s) booked at the same time, "
+                    f"its quantity cannot be lowered to {product.quantity}!")
+    
     @api.onchange('last_maintenance_date', 'maintenance_interval_days')
     def _onchange_maintenance_schedule(self):
         """Auto-calculate next maintenance date"""
         if self.last_maintenance_date and self.maintenance_interval_days:
             self.next_maintenance_date = self.last_maintenance_date + timedelta(days=self.maintenance_interval_days)
     
+    @api.model
+    def import_lines(self, lines, batch_size=1000):
+        """Create products in bulk.
+        
+        Each line is a dict with name, price_per_day and optionally product_code,
+        serial_number, brand, model, quantity, security_deposit, weekend_price,
+        holiday_price, location and purchase_date. Lines are validated in one pass
+        and against the codes already in use (one query), then created
+        batch_size at a time.
+        
+        Returns {'imported': count, 'rejected': [(line index, reason), ...]}.
+        """
+        entries, rejected = split_lines(lines)
+        codes = {line.get('product_code') for _index, line in entries if line.get('product_code')}
+        known_codes = {product['product_code'] for product in self.with_context(active_test=False).search_read(
+            [('product_code', 'in', list(codes))], ['product_code'])}
+        
+        rows = []
+        for index, line in entries:
+            name = str(line.get('name') or '').strip()
+            code = line.get('product_code') or False
+            try:
+                prices = {key: float(line.get(key) or 0.0)
+                          for key in ('price_per_day', 'security_deposit', 'weekend_price', 'holiday_price')}
+                quantity = int(line.get('quantity') or 1)
+                purchase_date = fields.Date.to_date(line.get('purchase_date') or None) or False
+            except (TypeError, ValueError):
+                rejected.append((index, "Invalid price, quantity or purchase date"))
+                continue
+            if not name:
+                rejected.append((index, "Name is required"))
+            elif prices['price_per_day'] <= 0:
+                rejected.append((index, "Price per day must be greater than zero"))
+            elif prices['security_deposit'] < 0:
+                rejected.append((index, "Security deposit cannot be negative"))
+            elif quantity < 1:
+                rejected.append((index, "Quantity must be at least 1"))
+            elif code and code in known_codes:
+                rejected.append((index, f"Product code '{code}' already exists"))
+            else:
+                if code:
+                    known_codes.add(code)
+                rows.append((index, dict(prices, **{
+                    'name': name,
+                    'product_code': code,
+                    'serial_number': line.get('serial_number') or False,
+                    'brand': line.get('brand') or False,
+                    'model': line.get('model') or False,
+                    'location': line.get('location') or False,
+                    'quantity': quantity,
+                    'purchase_date': purchase_date,
+                })))
+        
+        imported, failed = create_in_batches(self, rows, batch_size)
+        if codes:
+            self._sync_sequence_with_codes()
+        return {'imported': imported, 'rejected': sorted(rejected + failed)}
+    
+    @api.model
+    def _cron_schedule_maintenance(self, chunk_size=1000):
+        """Nightly: recompute the fleet's maintenance due dates and reserve a slot for the products
+        due within MAINTENANCE_LOOKAHEAD_DAYS.
+        
+        The due dates are refreshed by one UPDATE. The due products without a
+        planned slot are then processed in committed chunks: the booking
+        timelines of a chunk come from one query, and each product gets the
+        earliest booking-free gap long enough for its maintenance.
+        """
+        started = time.monotonic()
+        today = fields.Date.context_today(self)
+        self.flush_model(['last_maintenance_date', 'next_maintenance_date', 'maintenance_interval_days',
+                          'purchase_date'])
+        self.env.cr.execute("""
+            UPDATE rental_product
+               SET next_maintenance_date = COALESCE(last_maintenance_date, purchase_date, create_date::date)
+                                           + maintenance_interval_days
+             WHERE active
+               AND maintenance_interval_days > 0
+               AND next_maintenance_date IS DISTINCT FROM
+                   COALESCE(last_maintenance_date, purchase_date, create_date::date) + maintenance_interval_days
+        """)
+        updated = self.env.cr.rowcount
+        self.invalidate_model(['next_maintenance_date'])
+        
+        self.env['rental.maintenance.slot'].flush_model(['product_id', 'state'])
+        self.env.cr.execute("""
+            SELECT p.id FROM rental_product p
+             WHERE p.active
+               AND COALESCE(p.status, 'available') != 'retired'
+               AND p.next_maintenance_date <= %s
+               AND NOT EXISTS (SELECT 1 FROM rental_maintenance_slot s
+                                WHERE s.product_id = p.id AND s.state = 'planned')
+          ORDER BY p.id
+        """, [today + timedelta(days=MAINTENANCE_LOOKAHEAD_DAYS)])
+        due_ids = [row[0] for row in self.env.cr.fetchall()]
+        
+        for chunk in split_every(chunk_size, due_ids, self.browse):
+            chunk._schedule_maintenance(today)
+            self.env.flush_all()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            self.env.invalidate_all()
+        
+        elapsed = time.monotonic() - started
+        _logger.info("Maintenance scheduler: %d due date(s) updated, %d slot(s) planned in %.2fs",
+                     updated, len(due_ids), elapsed)
+        return {'updated': updated, 'planned': len(due_ids), 'elapsed': elapsed}
+    
+    def _schedule_maintenance(self, from_date):
+        """Reserve for each product of self a maintenance slot in the earliest gap of its bookings
+        on or after from_date, all units blocked"""
+        intervals = self.env['rental.order']._get_booked_intervals(self.ids, from_date, date.max)
+        slots = []
+        for product in self:
+            duration = max(product.maintenance_duration_days, 1)
+            start = earliest_gap(booked_units_runs(intervals.get(product.id, ())), from_date, duration)
+            slots.append({
+                'product_id': product.id,
+                'start_date': start,
+                'end_date': start + timedelta(days=duration - 1),
+                'quantity': product.quantity,
+            })
+        return self.env['rental.maintenance.slot'].create(slots)
+    
+    def action_schedule_maintenance(self):
+        """Reserve a maintenance slot in the earliest free gap from today"""
+        self._schedule_maintenance(fields.Date.context_today(self))
+        return True
+    
+    @api.model
+    def _cron_generate_image_variants(self, chunk_size=100, time_limit=600):
+        """One-off: derive the image variants of the products whose images predate image.mixin.
+        
+        Products with an image but no image_128 are found in one query on the
+        attachments, then their variants are computed chunk_size products at a
+        time, each chunk committed so the images of one chunk only are held in
+        memory. The run stops after time_limit seconds and resumes on the next
+        call; the cron deactivates itself once every product is done.
+        """
+        started = time.monotonic()
+        self.env.cr.execute("""
+            SELECT a.res_id FROM ir_attachment a
+             WHERE a.res_model = 'rental.product' AND a.res_field = 'image_1920'
+               AND NOT EXISTS (SELECT 1 FROM ir_attachment v
+                                WHERE v.res_model = 'rental.product' AND v.res_field = 'image_128'
+                                  AND v.res_id = a.res_id)
+          ORDER BY a.res_id
+        """)
+        product_ids = [row[0] for row in self.env.cr.fetchall()]
+        generated = 0
+        for chunk in split_every(chunk_size, product_ids, self.browse):
+            if time.monotonic() - started > time_limit:
+                break
+            for fname in IMAGE_VARIANTS:
+                self.env.add_to_compute(self._fields[fname], chunk)
+            self.env.flush_all()
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            generated += len(chunk)
+        
+        if generated == len(product_ids):
+            cron = self.env.ref('rental_management.ir_cron_rental_image_variants', raise_if_not_found=False)
+            if cron:
+                cron.sudo().active = False
+        _logger.info("Image variants: %d/%d product(s) processed in %.2fs",
+                     generated, len(product_ids), time.monotonic() - started)
+        return {'generated': generated, 'remaining': len(product_ids) - generated}
+    
     def action_set_maintenance(self):
         """Set product to maintenance status"""
         for product in self:
@@ -192,28 +534,197 @@ class RentalProduct(models.Model):
             'res_model': 'rental.order',
             'view_mode': 'list,form',
             'domain': [('product_id', '=', self.id)],
-            'context': {'default_product_id': self.id},
+            'context': {'default_product_id': self.id, 'active_test': False},
         }
     
-    def check_availability(self, start_date, end_date):
-        """Check if product is available for given period"""
-        conflicting_orders = self.rental_order_ids.filtered(
-            lambda o: o.state in ['confirmed', 'ongoing'] and not (
-                o.end_date < start_date or o.start_date > end_date
-            )
+    @profiled
+    def check_availability(self, start_date, end_date, quantity=1, exclude_order_ids=None):
+        """Check if the requested quantity is available for given period"""
+        peak_units = self.env['rental.order']._get_peak_booked_units(
+            self.ids, start_date, end_date, exclude_order_ids=exclude_order_ids,
         )
-        return len(conflicting_orders) == 0
+        return all(peak_units[product.id] + quantity <= product.quantity for product in self)
+    
+    @api.model
+    @profiled
+    def search_available(self, start_date, end_date, quantity=1):
+        """Return every bookable product free for the given period"""
+        return self.browse(self._get_available_product_ids(
+            fields.Date.to_date(start_date), fields.Date.to_date(end_date), quantity,
+        ))
     
-    def name_get(self):
-        """Custom display name"""
-        result = []
+    def _get_booking_rule_error(self, start_date, end_date):
+        """Return why the product's rental day limits or advance booking refuse the period, or None
+        (BOOKING_RULES_SQL is the catalog-wide counterpart)"""
+        self.ensure_one()
+        rental_days = (end_date - start_date).days + 1
+        earliest = fields.Date.context_today(self) + timedelta(days=self.advance_booking_days or 0)
+        if rental_days < (self.min_rental_days or 1):
+            return f"Product '{self.name}' is rented for at least {self.min_rental_days} day(s)!"
+        if self.max_rental_days and rental_days > self.max_rental_days:
+            return f"Product '{self.name}' is rented for at most {self.max_rental_days} day(s)!"
+        if start_date < earliest:
+            return f"Product '{self.name}' must be booked {self.advance_booking_days} day(s) in advance!"
+        return None
+    
+    @api.model
+    def _get_available_product_ids(self, start_date, end_date, quantity=1):
+        """Return the ids of the products that can take quantity units over the period.
+        
+        One query over the whole catalog: the booked units of each product are
+        summed from the confirmed/ongoing bookings and planned maintenance slots
+        overlapping the period (the partial indexes only hold live ones) and anti-joined to
+        the products. A sum within capacity proves the product free; only pooled
+        products whose sum exceeds it need the exact peak computed.
+        """
+        if not start_date or not end_date or end_date < start_date:
+            return []
+        rental_days = (end_date - start_date).days + 1
+        today = fields.Date.context_today(self)
+        self.env['rental.order'].flush_model(['product_id', 'state', 'start_date', 'end_date', 'quantity'])
+        self.env['rental.maintenance.slot'].flush_model(['product_id', 'state', 'start_date', 'end_date', 'quantity'])
+        self.flush_model(['active', 'status', 'quantity', 'min_rental_days',
+                          'max_rental_days', 'advance_booking_days'])
+        self.env.cr.execute(f"""
+            WITH booked AS (
+                SELECT product_id, SUM(quantity) AS units
+                  FROM (
+                    SELECT product_id, quantity
+                      FROM rental_order
+                     WHERE state IN %(booked_states)s
+                       AND start_date <= %(end_date)s
+                       AND end_date >= %(start_date)s
+                     UNION ALL
+                    SELECT product_id, quantity
+                      FROM rental_maintenance_slot
+                     WHERE state = 'planned'
+                       AND start_date <= %(end_date)s
+                       AND end_date >= %(start_date)s
+                  ) bookings
+              GROUP BY product_id
+            )
+            SELECT p.id, COALESCE(b.units, 0) + %(quantity)s <= p.quantity
+              FROM rental_product p
+         LEFT JOIN booked b ON b.product_id = p.id
+             WHERE p.active
+               AND COALESCE(p.status, 'available') NOT IN %(unbookable)s
+               AND p.quantity >= %(quantity)s
+               AND {BOOKING_RULES_SQL}
+               AND (COALESCE(b.units, 0) + %(quantity)s <= p.quantity OR p.quantity > %(quantity)s)
+        """, {
+            'booked_states': BOOKED_STATES,
+            'unbookable': UNBOOKABLE_STATUSES,
+            'start_date': start_date,
+            'end_date': end_date,
+            'today': today,
+            'quantity': quantity,
+            'rental_days': rental_days,
+        })
+        available_ids, maybe_ids = [], []
+        for product_id, is_free in self.env.cr.fetchall():
+            (available_ids if is_free else maybe_ids).append(product_id)
+        if maybe_ids:
+            peak_units = self.env['rental.order']._get_peak_booked_units(maybe_ids, start_date, end_date)
+            for product in self.browse(maybe_ids):
+                if peak_units[product.id] + quantity <= product.quantity:
+                    available_ids.append(product.id)
+        return available_ids
+    
+    @api.model
+    @profiled
+    def get_occupancy_grid(self, product_ids, date_from, days=90):
+        """Return the occupancy of product_ids over days days from date_from, in one call.
+        
+        Result: {'date_from', 'days', 'products': {id: {'capacity', 'runs'}}} where
+        runs are [first_offset, last_offset, units] day offsets from date_from.
+        Timelines of live bookings are cached per product in a bounded LRU and
+        revalidated against occupancy_version, so only products whose bookings
+        changed since the last call are queried again (in one batch). The version
+        is paired with the row's xmin: a bump made by a transaction that is then
+        rolled back leaves an xmin no other transaction ever sees, so a timeline
+        cached from it can never be served in place of the committed one.
+        """
+        date_from = fields.Date.to_date(date_from)
+        date_to = date_from + timedelta(days=days - 1)
+        self.flush_model(['occupancy_version', 'quantity'])
+        self.env.cr.execute("""
+            SELECT id, occupancy_version, xmin::text, quantity FROM rental_product WHERE id = ANY(%s)
+        """, [list(product_ids)])
+        rows = [(product_id, (version, xmin), quantity) for product_id, version, xmin, quantity in self.env.cr.fetchall()]
+        dbname = self.env.cr.dbname
+        
+        timelines, stale = {}, {}
+        for product_id, version, _quantity in rows:
+            cached = OCCUPANCY_CACHE.get((dbname, product_id))
+            if cached and cached[0] == version:
+                timelines[product_id] = cached[1]
+            else:
+                stale[product_id] = version
+        if stale:
+            intervals = self.env['rental.order']._get_booked_intervals(
+                list(stale), date.min, date.max,
+            )
+            for product_id, version in stale.items():
+                runs = tuple(booked_units_runs(intervals.get(product_id, ())))
+                OCCUPANCY_CACHE[(dbname, product_id)] = (version, runs)
+                timelines[product_id] = runs
+        
+        grid = {}
+        for product_id, _version, quantity in rows:
+            grid[product_id] = {
+                'capacity': quantity,
+                'runs': [
+                    [(max(first, date_from) - date_from).days, (min(last, date_to) - date_from).days, units]
+                    for first, last, units in timelines[product_id]
+                    if first <= date_to and last >= date_from
+                ],
+            }
+        return {'date_from': fields.Date.to_string(date_from), 'days': days, 'products': grid}
+    
+    def _invalidate_occupancy(self):
+        """Bump occupancy_version so every worker drops its cached timeline of these products"""
+        if not self:
+            return
+        self.env.cr.execute("""
+            UPDATE rental_product SET occupancy_version = COALESCE(occupancy_version, 0) + 1
+             WHERE id = ANY(%s)
+        """, [self.ids])
+        self.invalidate_recordset(['occupancy_version'])
+    
+    def _refresh_rental_status(self):
+        """Flag products as rented while all of their units are out, available otherwise"""
+        products = self.filtered(lambda p: p.status in ('available', 'rented'))
+        if not products:
+            return
+        units_out = dict(self.env['rental.order']._read_group(
+            [('product_id', 'in', products.ids), ('state', 'in', OUT_STATES)],
+            ['product_id'], ['quantity:sum'],
+        ))
+        rented = products.filtered(lambda p: units_out.get(p, 0) >= p.quantity)
+        rented.filtered(lambda p: p.status != 'rented').status = 'rented'
+        (products - rented).filtered(lambda p: p.status != 'available').status = 'available'
+    
+    @api.depends('name', 'product_code', 'status')
+    def _compute_complete_name(self):
+        """Compute "[code] name", plus the status when not available"""
         for product in self:
-            name = product.name
+            name = product.name or ''
             if product.product_code:
                 name = f"[{product.product_code}] {name}"
-            if product.status != 'available':
+            if product.status and product.status != 'available':
                 name = f"{name} ({product.status.title()})"
-            result.append((product.id, name))
-        return result
+            product.complete_name = name
+    
+    @api.model
+    def _fill_complete_name(self):
+        """Rebuild every complete_name in one UPDATE (migrations and bulk loads written in SQL)"""
+        self.env.cr.execute("""
+            UPDATE rental_product
+               SET complete_name = CASE WHEN product_code IS NULL THEN '' ELSE '[' || product_code || '] ' END
+                                   || name
+                                   || CASE WHEN COALESCE(status, 'available') = 'available' THEN ''
+                                           ELSE ' (' || initcap(status) || ')' END
+        """)
+        self.invalidate_model(['complete_name'])
     
     
\ No newline at end of file
@@ -0,0 +1,84 @@
+# rental_profiling.py
+import functools
+import time
+from collections import deque
+
+from odoo import models, api, tools
+
+# Calls kept per worker process, the oldest are dropped first
+PROFILE_BUFFER_SIZE = 5000
+PROFILE_BUFFER = deque(maxlen=PROFILE_BUFFER_SIZE)
+PROFILING_PARAM = 'rental_management.profiling'
+
+
+def cache_size(env):
+    """Return the number of field values held in env's ORM cache"""
+    return sum(len(values) for values in getattr(env.cache, '_data', {}).values())
+
+
+def profiled(method):
+    """Record the SQL queries, ORM cache fills and wall time of each call of method in PROFILE_BUFFER.
+    
+    Place it innermost (right above the def) so api.depends, api.constrains and
+    api.model decorate the wrapper. When profiling is off the wrapper only
+    checks the cached flag.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self.env['rental.profiler']._is_enabled():
+            return method(self, *args, **kwargs)
+        queries, cached, started = self.env.cr.sql_log_count, cache_size(self.env), time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            PROFILE_BUFFER.append({
+                'at': time.time(),
+                'method': f"{self._name}.{method.__name__}",
+                'records': len(self) if isinstance(self, models.BaseModel) else 0,
+                'queries': self.env.cr.sql_log_count - queries,
+                'cache_fills': cache_size(self.env) - cached,
+                'ms': round((time.perf_counter() - started) * 1000, 3),
+            })
+    return wrapper
+
+
+class RentalProfiler(models.AbstractModel):
+    """Switch and summaries of the in-process profiling of the rental hot paths"""
+    _name = 'rental.profiler'
+    _description = 'Rental Profiler'
+    
+    @api.model
+    @tools.ormcache()
+    def _is_enabled(self):
+        """Return whether profiling is on (rental_management.profiling system parameter)"""
+        return self.env['ir.config_parameter'].sudo().get_param(PROFILING_PARAM) == 'True'
+    
+    @api.model
+    def _set_enabled(self, enabled):
+        """Turn profiling on or off (the parameter write clears the ormcache of every worker)"""
+        self.env['ir.config_parameter'].sudo().set_param(PROFILING_PARAM, str(bool(enabled)))
+    
+    @api.model
+    def _get_calls(self):
+        """Return the recorded calls of this worker, oldest first"""
+        return list(PROFILE_BUFFER)
+    
+    @api.model
+    def _clear(self):
+        """Drop the recorded calls of this worker"""
+        PROFILE_BUFFER.clear()
+    
+    @api.model
+    def _summarize(self, calls=None):
+        """Return per-method totals of calls, slowest total time first"""
+        totals = {}
+        for call in self._get_calls() if calls is None else calls:
+            total = totals.setdefault(call['method'], {
+                'method': call['method'], 'calls': 0, 'records': 0, 'queries': 0, 'cache_fills': 0,
+                'ms': 0.0, 'max_ms': 0.0,
+            })
+            total['calls'] += 1
+            for key in ('records', 'queries', 'cache_fills', 'ms'):
+                total[key] += call[key]
+            total['max_ms'] = max(total['max_ms'], call['ms'])
+        return sorted(totals.values(), key=lambda total: total['ms'], reverse=True)
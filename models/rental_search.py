@@ -0,0 +1,69 @@
+# rental_search.py
+from odoo import models, api
+from odoo.tools.misc import escape_psql
+
+# model -> columns searched by quick_search (each one has a trigram index)
+QUICK_SEARCH_FIELDS = {
+    'rental.customer': ('name', 'email', 'phone', 'customer_code'),
+    'rental.product': ('name', 'serial_number', 'product_code'),
+    'rental.order': ('name',),
+}
+
+# Candidates fetched per returned hit, the surplus covering those hidden by record rules
+QUICK_SEARCH_CANDIDATES = 50
+
+
+class RentalSearch(models.AbstractModel):
+    _name = 'rental.search'
+    _description = 'Rental Quick Search'
+    
+    @api.model
+    def quick_search(self, term, limit=10):
+        """Type-ahead search over customers, products and orders, best matches first.
+        
+        One query per model: the ILIKE and word similarity (<%) filters are served
+        by the pg_trgm GIN indexes of the searched columns and the best candidates
+        are picked by trigram similarity (by match position when pg_trgm is not
+        available), then restricted to the records the user may read.
+        Returns [{'model', 'id', 'name', 'score'}, ...].
+        """
+        term = (term or '').strip()
+        if len(term) < 2:
+            return []
+        pattern = f"%{escape_psql(term)}%"
+        hits = []
+        for model_name, fnames in QUICK_SEARCH_FIELDS.items():
+            model = self.env[model_name]
+            if not model.check_access_rights('read', raise_exception=False):
+                continue
+            model.flush_model(list(fnames))
+            columns = [f'"{fname}"' for fname in fnames]
+            if self.env.registry.has_trigram:
+                matches = ' OR '.join(f"{column} ILIKE %(pattern)s OR %(term)s <%% {column}" for column in columns)
+                ranks = [f"COALESCE(word_similarity(%(term)s, {column}), 0)" for column in columns]
+                score = f"GREATEST({', '.join(ranks)})"
+            else:
+                matches = ' OR '.join(f"{column} ILIKE %(pattern)s" for column in columns)
+                ranks = [f"COALESCE(NULLIF(strpos(lower({column}), lower(%(term)s)), 0), 1000)" for column in columns]
+                score = f"1.0 / (1 + LEAST({', '.join(ranks)}))"
+            active = ' AND active' if 'active' in model._fields else ''
+            # Best candidates first, with headroom for the ones hidden by record rules
+            self.env.cr.execute(f"""
+                SELECT id, {score} AS score
+                  FROM "{model._table}"
+                 WHERE ({matches}){active}
+              ORDER BY score DESC, id DESC
+                 LIMIT %(candidates)s
+            """, {'pattern': pattern, 'term': term, 'candidates': limit * QUICK_SEARCH_CANDIDATES})
+            candidates = self.env.cr.fetchall()
+            readable = set(model.search([('id', 'in', [record_id for record_id, _score in candidates])]).ids)
+            scores = dict([candidate for candidate in candidates if candidate[0] in readable][:limit])
+            for record in model.browse(list(scores)):
+                hits.append({
+                    'model': model_name,
+                    'id': record.id,
+                    'name': record.display_name,
+                    'score': float(scores[record.id]),
+                })
+        hits.sort(key=lambda hit: hit['score'], reverse=True)
+        return hits[:limit]
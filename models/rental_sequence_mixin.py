@@ -0,0 +1,63 @@
+# rental_sequence_mixin.py
+import re
+
+from odoo import models, api
+from odoo.exceptions import UserError
+
+
+class RentalSequenceMixin(models.AbstractModel):
+    """Allocate reference codes (ROxxxx, PRODxxxx, ...) from ir.sequence in batches"""
+    _name = 'rental.sequence.mixin'
+    _description = 'Rental Sequence Mixin'
+    
+    # Field receiving the code, ir.sequence code, and the placeholder value meaning "no code yet"
+    _sequence_field = None
+    _sequence_code = None
+    _sequence_placeholder = False
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Allocate one code per new record, with a single sequence call for the batch"""
+        missing = [vals for vals in vals_list
+                   if vals.get(self._sequence_field, self._sequence_placeholder) in (False, self._sequence_placeholder)]
+        if missing:
+            for vals, code in zip(missing, self._next_sequence_codes(len(missing))):
+                vals[self._sequence_field] = code
+        return super().create(vals_list)
+    
+    @api.model
+    def _get_sequence(self):
+        """Return the ir.sequence used for this model's codes"""
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', self._sequence_code),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            raise UserError(f"Sequence '{self._sequence_code}' is missing, please reinstall the module data!")
+        return sequence
+    
+    @api.model
+    def _next_sequence_codes(self, count):
+        """Return count new codes, drawn from the PostgreSQL sequence in one round trip"""
+        sequence = self._get_sequence()
+        if sequence.implementation != 'standard' or sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+        self.env.cr.execute(
+            "SELECT nextval(%s) FROM generate_series(1, %s)",
+            [f'ir_sequence_{sequence.id:03d}', count],
+        )
+        return [sequence.get_next_char(number) for number, in self.env.cr.fetchall()]
+    
+    @api.model
+    def _sync_sequence_with_codes(self):
+        """Move the sequence past the highest code already stored (codes created before ir.sequence)"""
+        sequence = self._get_sequence()
+        prefix = sequence.prefix or ''
+        self.flush_model([self._sequence_field])
+        self.env.cr.execute(
+            f'SELECT MAX(substring("{self._sequence_field}" FROM %s)::bigint) FROM "{self._table}"',
+            [f'^{re.escape(prefix)}(\\d+)$'],
+        )
+        highest = self.env.cr.fetchone()[0]
+        if highest and highest >= sequence.number_next_actual:
+            sequence.write({'number_next': highest + 1})
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+from . import test_rental_sequence
+from . import test_rental_benchmark
+from . import test_rental_repricing
+from . import test_rental_payment
+from . import test_rental_import
+from . import test_rental_maintenance
+from . import test_rental_availability
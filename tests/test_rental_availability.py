@@ -0,0 +1,53 @@
+# test_rental_availability.py
+from datetime import date, timedelta
+
+from odoo.tests import BaseCase, tagged
+
+from odoo.addons.rental_management.models.rental_order import booked_units_runs, earliest_gap, peak_booked_units
+
+
+def day(n):
+    return date(2030, 1, 1) + timedelta(days=n)
+
+
+@tagged('post_install', '-at_install')
+class TestAvailabilitySweep(BaseCase):
+    """The sweep-line helpers of the availability engine: intervals are (start, end, units), both days booked"""
+    
+    def test_empty(self):
+        self.assertEqual(peak_booked_units([], day(0), day(10)), 0)
+        self.assertEqual(booked_units_runs([]), [])
+        self.assertEqual(earliest_gap([], day(3), 5), day(3))
+    
+    def test_back_to_back(self):
+        """An order ending on the day the next one starts shares that day; the day after does not"""
+        sharing = [(day(0), day(3), 1), (day(3), day(5), 1)]
+        self.assertEqual(peak_booked_units(sharing, day(0), day(5)), 2)
+        self.assertEqual(booked_units_runs(sharing), [(day(0), day(2), 1), (day(3), day(3), 2), (day(4), day(5), 1)])
+        following = [(day(0), day(3), 1), (day(4), day(5), 1)]
+        self.assertEqual(peak_booked_units(following, day(0), day(5)), 1)
+        self.assertEqual(booked_units_runs(following), [(day(0), day(3), 1), (day(4), day(5), 1)])
+    
+    def test_single_day_and_empty_period(self):
+        intervals = [(day(2), day(2), 3), (day(1), day(4), 1)]
+        self.assertEqual(peak_booked_units(intervals, day(2), day(2)), 4)
+        self.assertEqual(peak_booked_units(intervals, day(3), day(3)), 1)
+        # A period ending before it starts books nothing
+        self.assertEqual(peak_booked_units(intervals, day(4), day(3)), 0)
+        self.assertEqual(booked_units_runs([(day(2), day(2), 3)]), [(day(2), day(2), 3)])
+    
+    def test_period_clipping(self):
+        """Only the part of the bookings inside the period counts"""
+        intervals = [(day(0), day(5), 2), (day(6), day(9), 3)]
+        self.assertEqual(peak_booked_units(intervals, day(0), day(5)), 2)
+        self.assertEqual(peak_booked_units(intervals, day(5), day(6)), 3)
+        self.assertEqual(peak_booked_units(intervals, day(10), day(20)), 0)
+    
+    def test_earliest_gap(self):
+        runs = booked_units_runs([(day(0), day(2), 1), (day(5), day(6), 1), (day(8), day(8), 1)])
+        self.assertEqual(earliest_gap(runs, day(0), 2), day(3))
+        self.assertEqual(earliest_gap(runs, day(0), 3), day(9))
+        self.assertEqual(earliest_gap(runs, day(7), 1), day(7))
+        self.assertEqual(earliest_gap(runs, day(4), 1), day(4))
+        # Runs entirely before the start date are ignored
+        self.assertEqual(earliest_gap(runs, day(20), 4), day(20))
@@ -0,0 +1,54 @@
+# test_rental_benchmark.py
+import json
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools.misc import file_path
+
+from odoo.addons.rental_management.models.rental_benchmark import BENCH_TIME_TOLERANCE
+
+# Scaled-down dataset: large enough for the hot paths to hit the indexes, small enough for a test run
+BENCH_TEST_SIZES = {'customers': 2000, 'products': 200, 'orders': 20000}
+# Baselines of the scaled-down dataset, shipped with the module
+BENCH_TEST_BASELINES = 'rental_management/data/rental_benchmark_baselines.json'
+
+
+@tagged('-standard', 'rental_benchmark')
+class TestRentalBenchmark(TransactionCase):
+    """Run with --test-tags rental_benchmark. The shipped baselines are refreshed by pointing
+    rental_management.benchmark_baselines_path at data/rental_benchmark_baselines.json and running
+    env['rental.benchmark']._run_benchmarks(update_baselines=True) on this dataset"""
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.baselines_path = file_path(BENCH_TEST_BASELINES)
+        with open(cls.baselines_path) as baselines_file:
+            cls.baselines = json.load(baselines_file)
+        cls.env['ir.config_parameter'].sudo().set_param(
+            'rental_management.benchmark_baselines_path', cls.baselines_path)
+        cls.env['rental.benchmark']._generate_data(**BENCH_TEST_SIZES)
+    
+    def test_generated_data(self):
+        """The generator creates the requested records, their payment ledger and statistics"""
+        Product = self.env['rental.product'].with_context(active_test=False)
+        products = Product.search([('product_code', '=like', 'BPROD%')])
+        self.assertEqual(len(products), BENCH_TEST_SIZES['products'])
+        done = self.env['rental.order'].search([('product_id', 'in', products.ids), ('state', '=', 'done')])
+        self.assertEqual(sum(products.mapped('rental_count')), len(done))
+        self.assertEqual(self.env['rental.customer']._cron_reconcile_outstanding_balances()['drifted'], 0)
+        paid = done.mapped('paid_amount')
+        done.invalidate_recordset(['paid_amount'])
+        self.env.add_to_compute(done._fields['paid_amount'], done)
+        self.assertEqual(done.mapped('paid_amount'), paid)
+    
+    def test_benchmarks_within_baselines(self):
+        """Every benchmark has a baseline and stays within it: query count, and time within tolerance"""
+        Benchmark = self.env['rental.benchmark']
+        self.assertEqual(set(self.baselines), set(Benchmark._get_benchmarks()),
+                         "Every benchmark needs a shipped baseline")
+        results = Benchmark._run_benchmarks()
+        for name, result in results.items():
+            baseline = self.baselines[name]
+            with self.subTest(benchmark=name):
+                self.assertLessEqual(result['queries'], baseline['queries'])
+                self.assertLessEqual(result['seconds'], baseline['seconds'] * (1 + BENCH_TIME_TOLERANCE))
@@ -0,0 +1,23 @@
+# test_rental_import.py
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRentalImport(TransactionCase):
+    
+    def test_non_record_lines_rejected(self):
+        """Lines that are not dicts are reported as rejected, the valid ones still imported"""
+        customer_lines = [[], {'name': "Import Customer", 'email': 'import@example.com',
+                               'phone': '0812345678', 'customer_type': ''}, "x", 1]
+        result = self.env['rental.customer'].import_lines(customer_lines)
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(sorted(index for index, _reason in result['rejected']), [0, 2, 3])
+        
+        result = self.env['rental.product'].import_lines([None, {'name': "Import Product", 'price_per_day': '10'}])
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual([index for index, _reason in result['rejected']], [0])
+        
+        for model, method in (('rental.order', 'import_lines'), ('rental.payment', 'import_statement_lines')):
+            result = getattr(self.env[model], method)([[], "x"])
+            self.assertEqual(result['imported'], 0)
+            self.assertEqual(sorted(index for index, _reason in result['rejected']), [0, 1])
@@ -0,0 +1,35 @@
+# test_rental_maintenance.py
+from datetime import timedelta
+
+from odoo import fields
+from odoo.exceptions import ValidationError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRentalMaintenance(TransactionCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.product = cls.env['rental.product'].create({
+            'name': "Maintenance Product", 'price_per_day': 50.0, 'quantity': 3, 'maintenance_duration_days': 2,
+        })
+        cls.today = fields.Date.context_today(cls.product)
+    
+    def test_overlapping_slot_rejected(self):
+        """A second planned slot overlapping the first one is refused, a later one accepted"""
+        Slot = self.env['rental.maintenance.slot']
+        start = self.today + timedelta(days=5)
+        Slot.create({'product_id': self.product.id, 'start_date': start, 'end_date': start + timedelta(days=2)})
+        with self.assertRaises(ValidationError):
+            Slot.create({'product_id': self.product.id, 'start_date': start + timedelta(days=2),
+                         'end_date': start + timedelta(days=4)})
+        Slot.create({'product_id': self.product.id, 'start_date': start + timedelta(days=3),
+                     'end_date': start + timedelta(days=4)})
+    
+    def test_scheduling_twice_never_overlaps(self):
+        """Scheduling again places the new slot after the planned one"""
+        first = self.product._schedule_maintenance(self.today)
+        second = self.product._schedule_maintenance(self.today)
+        self.assertGreater(second.start_date, first.end_date)
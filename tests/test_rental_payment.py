@@ -0,0 +1,55 @@
+# test_rental_payment.py
+from datetime import timedelta
+
+from odoo import fields
+from odoo.exceptions import UserError
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRentalPayment(TransactionCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        customer = cls.env['rental.customer'].create({
+            'name': "Payment Customer", 'email': 'payment@example.com', 'phone': '0812345678',
+        })
+        product = cls.env['rental.product'].create({'name': "Payment Product", 'price_per_day': 100.0, 'quantity': 5})
+        start = fields.Date.context_today(customer) + timedelta(days=10)
+        cls.order, cls.cancelled = cls.env['rental.order'].create([{
+            'customer_id': customer.id,
+            'product_id': product.id,
+            'start_date': start,
+            'end_date': start + timedelta(days=2),
+        } for _i in range(2)])
+        (cls.order | cls.cancelled).action_confirm()
+        cls.cancelled.action_cancel()
+    
+    def test_overpayment_rejected(self):
+        """A payment taking the paid amount over the total price is refused"""
+        Payment = self.env['rental.payment']
+        Payment.create({'order_id': self.order.id, 'amount': self.order.total_price - 10})
+        with self.assertRaises(UserError):
+            Payment.create({'order_id': self.order.id, 'amount': 20})
+        with self.assertRaises(UserError):
+            Payment.create([{'order_id': self.order.id, 'amount': 5}, {'order_id': self.order.id, 'amount': 6}])
+        Payment.create({'order_id': self.order.id, 'amount': 10})
+        self.assertEqual(self.order.payment_status, 'paid')
+    
+    def test_cancelled_order_cannot_be_paid(self):
+        """Cancelled orders take no payment"""
+        with self.assertRaises(UserError):
+            self.env['rental.payment'].create({'order_id': self.cancelled.id, 'amount': 50})
+        self.assertEqual(self.cancelled.paid_amount, 0.0)
+    
+    def test_statement_import_rejects_invalid_payments(self):
+        """Statement lines for overpayments and cancelled orders are reported, the others imported"""
+        result = self.env['rental.payment'].import_statement_lines([
+            {'order': self.order.name, 'amount': self.order.total_price, 'reference': 'ST1'},
+            {'order': self.order.name, 'amount': 1, 'reference': 'ST2'},
+            {'order': self.cancelled.name, 'amount': 50, 'reference': 'ST3'},
+        ])
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual([index for index, _reason in result['rejected']], [1, 2])
+        self.assertEqual(self.order.paid_amount, self.order.total_price)
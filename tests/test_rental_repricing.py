@@ -0,0 +1,47 @@
+# test_rental_repricing.py
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import TransactionCase, tagged
+
+
+@tagged('post_install', '-at_install')
+class TestRentalRepricing(TransactionCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.customer = cls.env['rental.customer'].create({
+            'name': "Repricing Customer", 'email': 'repricing@example.com', 'phone': '0812345678',
+        })
+        cls.product = cls.env['rental.product'].create({
+            'name': "Repricing Product", 'price_per_day': 100.0,
+            'insurance_required': True, 'insurance_cost_per_day': 5.0,
+        })
+        cls.start = fields.Date.context_today(cls.customer) + timedelta(days=10)
+    
+    def _create_order(self, **vals):
+        return self.env['rental.order'].create(dict({
+            'customer_id': self.customer.id,
+            'product_id': self.product.id,
+            'start_date': self.start,
+            'end_date': self.start + timedelta(days=2),
+        }, **vals))
+    
+    def test_insurance_cost_reprices_draft(self):
+        """Changing the insurance cost per day reprices an open draft"""
+        order = self._create_order()
+        self.assertEqual(order.insurance_fee, 15.0)
+        total = order.total_price
+        self.product.insurance_cost_per_day = 10.0
+        self.assertEqual(order.insurance_fee, 30.0)
+        self.assertAlmostEqual(order.total_price, total + 15.0)
+    
+    def test_insurance_change_moves_statistics(self):
+        """The revenue of done orders follows an insurance change without drift"""
+        order = self._create_order(state='done')
+        self.assertAlmostEqual(self.product.total_revenue, order.total_price)
+        self.product.insurance_required = False
+        self.assertEqual(order.insurance_fee, 0.0)
+        self.assertAlmostEqual(self.product.total_revenue, order.total_price)
+        self.assertEqual(self.env['rental.product']._cron_reconcile_rental_statistics()['drifted'], 0)
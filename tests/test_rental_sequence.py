@@ -0,0 +1,58 @@
+# test_rental_sequence.py
+import threading
+
+from psycopg2 import IntegrityError
+
+from odoo import api, SUPERUSER_ID
+from odoo.sql_db import db_connect
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import mute_logger
+
+
+@tagged('post_install', '-at_install')
+class TestRentalSequence(TransactionCase):
+    
+    def test_batch_codes_follow_sequence(self):
+        """A batch create draws consecutive codes from the sequence in one call"""
+        products = self.env['rental.product'].create([
+            {'name': f"Sequence {index}", 'price_per_day': 10.0} for index in range(5)
+        ])
+        numbers = [int(code.removeprefix('PROD')) for code in products.mapped('product_code')]
+        self.assertEqual(numbers, list(range(numbers[0], numbers[0] + 5)))
+    
+    def test_duplicate_code_rejected(self):
+        """The UNIQUE constraint refuses a code already in use"""
+        product = self.env['rental.product'].create({'name': "Original", 'price_per_day': 10.0})
+        with mute_logger('odoo.sql_db'), self.assertRaises(IntegrityError), self.cr.savepoint():
+            self.env['rental.product'].create({
+                'name': "Copy", 'price_per_day': 10.0, 'product_code': product.product_code,
+            })
+    
+    def test_concurrent_creates_get_distinct_codes(self):
+        """Transactions creating products at the same time never draw the same code"""
+        codes, errors = [], []
+        barrier = threading.Barrier(4)
+        
+        def create_products():
+            # A cursor of its own, outside the test transaction, rolled back at the end
+            with db_connect(self.env.cr.dbname).cursor() as cr:
+                try:
+                    env = api.Environment(cr, SUPERUSER_ID, {})
+                    barrier.wait(timeout=10)
+                    products = env['rental.product'].create([
+                        {'name': f"Concurrent {index}", 'price_per_day': 10.0} for index in range(25)
+                    ])
+                    codes.extend(products.mapped('product_code'))
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    cr.rollback()
+        
+        threads = [threading.Thread(target=create_products) for _i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertFalse(errors)
+        self.assertEqual(len(codes), 100)
+        self.assertEqual(len(set(codes)), 100)
@@ -1 +1,4 @@
-from . import rental_payment_wizard
\ No newline at end of file
+from . import rental_payment_wizard
+from . import rental_payment_import_wizard
+from . import rental_bulk_import_wizard
+from . import rental_profiler_wizard
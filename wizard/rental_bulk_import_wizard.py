@@ -0,0 +1,77 @@
+import base64
+import csv
+import io
+import json
+
+from odoo import models, fields
+from odoo.exceptions import UserError
+
+# import type -> model providing import_lines
+IMPORT_MODELS = {
+    'customer': 'rental.customer',
+    'product': 'rental.product',
+    'order': 'rental.order',
+}
+
+
+class RentalBulkImportWizard(models.TransientModel):
+    _name = 'rental.bulk.import.wizard'
+    _description = 'Rental Bulk Import Wizard'
+    
+    import_type = fields.Selection([
+        ('customer', 'Customers'),
+        ('product', 'Products'),
+        ('order', 'Historical Orders'),
+    ], string='Import', required=True, default='customer')
+    file = fields.Binary(string='File (CSV or JSONL)', required=True)
+    filename = fields.Char(string='File Name')
+    result = fields.Text(string='Result', readonly=True)
+    reject_file = fields.Binary(string='Rejected Lines', readonly=True, attachment=False)
+    reject_filename = fields.Char(string='Reject File Name')
+    
+    def _read_lines(self):
+        """Return the file's lines: one JSON value per line for .jsonl files, CSV rows otherwise.
+        
+        JSON values that are not objects are kept as is, so import_lines rejects them under their
+        own line number; they are written to the reject file as {'value': raw value}.
+        """
+        try:
+            content = base64.b64decode(self.file).decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise UserError("The file must be UTF-8 encoded!")
+        if (self.filename or '').lower().endswith(('.jsonl', '.ndjson')):
+            try:
+                return [json.loads(line) for line in content.splitlines() if line.strip()]
+            except ValueError as error:
+                raise UserError(f"Invalid JSONL file: {error}")
+        return list(csv.DictReader(io.StringIO(content)))
+    
+    def action_import(self):
+        """Import the file and attach the rejected lines, with their reasons, as a CSV file"""
+        self.ensure_one()
+        lines = self._read_lines()
+        report = self.env[IMPORT_MODELS[self.import_type]].import_lines(lines)
+        lines = [line if isinstance(line, dict) else {'value': line} for line in lines]
+        result = [f"{report['imported']} record(s) imported, {len(report['rejected'])} rejected."]
+        # Line numbers as seen in the file: CSV has a header line
+        offset = 1 if self.filename and self.filename.lower().endswith(('.jsonl', '.ndjson')) else 2
+        result += [f"Line {index + offset}: {reason}" for index, reason in report['rejected'][:100]]
+        self.result = '\n'.join(result)
+        
+        self.reject_file = self.reject_filename = False
+        if report['rejected']:
+            columns = list(dict.fromkeys(key for index, _reason in report['rejected'] for key in lines[index]))
+            output = io.StringIO()
+            writer = csv.DictWriter(output, fieldnames=['line', 'reason'] + columns, extrasaction='ignore')
+            writer.writeheader()
+            for index, reason in report['rejected']:
+                writer.writerow(dict(lines[index], line=index + offset, reason=reason))
+            self.reject_file = base64.b64encode(output.getvalue().encode('utf-8'))
+            self.reject_filename = f"rejected_{self.import_type}s.csv"
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
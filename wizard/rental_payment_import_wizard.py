@@ -0,0 +1,38 @@
+import base64
+import csv
+import io
+
+from odoo import models, fields
+from odoo.exceptions import UserError
+
+
+class RentalPaymentImportWizard(models.TransientModel):
+    _name = 'rental.payment.import.wizard'
+    _description = 'Rental Payment Import Wizard'
+    
+    file = fields.Binary(string='Bank Statement (CSV)', required=True)
+    filename = fields.Char(string='File Name')
+    result = fields.Text(string='Result', readonly=True)
+    
+    def action_import(self):
+        """Import the statement: CSV with order, amount, date, reference and payment_method columns"""
+        self.ensure_one()
+        try:
+            content = base64.b64decode(self.file).decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise UserError("The statement must be an UTF-8 encoded CSV file!")
+        lines = list(csv.DictReader(io.StringIO(content)))
+        if lines and 'order' not in lines[0]:
+            raise UserError("The statement must have at least 'order' and 'amount' columns!")
+        report = self.env['rental.payment'].import_statement_lines(lines)
+        result = [f"{report['imported']} payment(s) imported, {len(report['rejected'])} rejected."]
+        # CSV line numbers: the header is line 1
+        result += [f"Line {index + 2}: {reason}" for index, reason in report['rejected']]
+        self.result = '\n'.join(result)
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
@@ -1,6 +1,8 @@
 from odoo import models, fields, api
 from odoo.exceptions import ValidationError
 
+from ..models.rental_payment import PAYMENT_METHODS
+
 class RentalPaymentWizard(models.TransientModel):
     _name = 'rental.payment.wizard'
     _description = 'Rental Payment Wizard'
@@ -8,12 +10,7 @@ class RentalPaymentWizard(models.TransientModel):
     order_id = fields.Many2one('rental.order', string='Rental Order', required=True)
     payment_amount = fields.Float(string='Payment Amount', required=True)
     payment_date = fields.Date(string='Payment Date', default=fields.Date.today, required=True)
-    payment_method = fields.Selection([
-        ('cash', 'Cash'),
-        ('bank_transfer', 'Bank Transfer'),
-        ('credit_card', 'Credit Card'),
-        ('debit_card', 'Debit Card'),
-    ], string='Payment Method', required=True, default='cash')
+    payment_method = fields.Selection(PAYMENT_METHODS, string='Payment Method', required=True, default='cash')
     notes = fields.Text(string='Notes')
     
     # Untuk display info
@@ -33,15 +30,13 @@ class RentalPaymentWizard(models.TransientModel):
         """Process the payment"""
         self.ensure_one()
         
-        # Update paid amount di order
-        self.order_id.paid_amount += self.payment_amount
-        
-        # Update payment status
-        if self.order_id.paid_amount >= self.order_id.total_price:
-            self.order_id.payment_status = 'paid'
-        elif self.order_id.paid_amount > 0:
-            self.order_id.payment_status = 'partial'
-        
-        # TODO: Nanti bisa ditambahkan create payment record/journal entry
+        # Append to the payment ledger, paid_amount and payment_status follow from it
+        self.env['rental.payment'].create({
+            'order_id': self.order_id.id,
+            'amount': self.payment_amount,
+            'payment_date': self.payment_date,
+            'payment_method': self.payment_method,
+            'notes': self.notes,
+        })
         
         return {'type': 'ir.actions.act_window_close'}
\ No newline at end of file
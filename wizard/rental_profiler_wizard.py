@@ -0,0 +1,62 @@
+import base64
+import json
+
+from odoo import models, fields, api
+
+
+class RentalProfilerWizard(models.TransientModel):
+    _name = 'rental.profiler.wizard'
+    _description = 'Rental Profiler Viewer'
+    
+    enabled = fields.Boolean(string='Profiling Enabled', default=lambda self: self.env['rental.profiler']._is_enabled())
+    summary = fields.Text(string='Summary', compute='_compute_summary')
+    export_file = fields.Binary(string='Export', readonly=True, attachment=False)
+    export_filename = fields.Char(string='Export File Name')
+    
+    @api.depends('enabled')
+    def _compute_summary(self):
+        """Per-method totals of the calls recorded by this worker, slowest first"""
+        profiler = self.env['rental.profiler']
+        calls = profiler._get_calls()
+        lines = [f"{len(calls)} call(s) recorded by this worker.", ""]
+        lines += [
+            f"{total['method']}: {total['calls']} call(s), {total['records']} record(s), "
+            f"{total['queries']} queries, {total['cache_fills']} cache fills, "
+            f"{total['ms']:.1f} ms (max {total['max_ms']:.1f} ms)"
+            for total in profiler._summarize(calls)
+        ]
+        for wizard in self:
+            wizard.summary = '\n'.join(lines)
+    
+    def _reopen(self):
+        """Keep the viewer open after a button"""
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+    
+    def action_apply(self):
+        """Turn profiling on or off"""
+        self.ensure_one()
+        self.env['rental.profiler']._set_enabled(self.enabled)
+        return self._reopen()
+    
+    def action_clear(self):
+        """Drop the recorded calls"""
+        self.ensure_one()
+        self.env['rental.profiler']._clear()
+        self.export_file = self.export_filename = False
+        return self._reopen()
+    
+    def action_export(self):
+        """Attach the recorded calls and their summary as a JSON file"""
+        self.ensure_one()
+        profiler = self.env['rental.profiler']
+        calls = profiler._get_calls()
+        content = json.dumps({'summary': profiler._summarize(calls), 'calls': calls}, indent=2)
+        self.export_file = base64.b64encode(content.encode('utf-8'))
+        self.export_filename = 'rental_profile.json'
+        return self._reopen()